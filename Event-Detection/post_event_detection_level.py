@@ -13,7 +13,7 @@ Author: Eduardo Nigro
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import signal
-from utils import find_cluster
+from utils import find_trigger
 
 def make_fig():
     """
@@ -95,14 +95,8 @@ ax.legend(loc='upper right')
 ax = make_fig()
 ax.plot(tn, xf, linewidth=1.5, label='Filtered', color='#ff7f0e', zorder=0)
 # Finding and plotting positive peaks
-imax = []
-icl, ncl = find_cluster(xf>1, 1)
-for ik, nk in zip(icl, ncl):
-    imax.append(ik+np.argmax(xf[ik:ik+nk])-1)
-    ax.scatter(tn[imax[-1]], xf[imax[-1]], s=25, c='#008800')
+events = find_trigger(xf, 1, t=tn)
+ax.scatter(events['tpeak'], events['xpeak'], s=25, c='#008800')
 # Finding and plotting negative peaks
-imin = []
-icl, ncl = find_cluster(xf<-1, 1)
-for ik, nk in zip(icl, ncl):
-    imin.append(ik+np.argmin(xf[ik:ik+nk])-1)
-    ax.scatter(tn[imin[-1]], xf[imin[-1]], s=25, c='#880000')
+events = find_trigger(xf, -1, t=tn, edge='falling')
+ax.scatter(events['tpeak'], events['xpeak'], s=25, c='#880000')
@@ -12,7 +12,7 @@ Author: Eduardo Nigro
 """
 import numpy as np
 import matplotlib.pyplot as plt
-from utils import find_cluster
+from utils import find_trigger
 
 def make_fig():
     #
@@ -70,8 +70,9 @@ dxdt = np.gradient(x, t)
 dxdt = dxdt/np.max(dxdt)
 
 # Finding trigger event times
-icl, ncl = find_cluster(dxdt>0.5, 1)
-ttrigger = t[icl]
+events = find_trigger(dxdt, 0.5, t=t)
+icl, ncl = events['i0'], events['clustersize']
+ttrigger = events['t0']
 
 ax = make_fig()
 ax.set_ylabel('Trigger signal (V)')
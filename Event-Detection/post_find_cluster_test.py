@@ -0,0 +1,107 @@
+""" post_find_cluster_test.py
+
+Checks the vectorized find_cluster against the original loop implementation
+and compares their execution times.
+
+The condition masks are random and include the cases where clusters touch
+the first and/or last elements of the array, as well as empty, all-True and
+all-False arrays.
+
+Note: Use the utils.py module located in the same folder as this file.
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+
+"""
+import timeit
+import numpy as np
+from utils import find_cluster
+
+
+def find_cluster_loop(x, xval):
+    """
+    Reference (loop based) implementation of find_cluster.
+
+    """
+    # Cluster information list
+    a = []
+    # Initial (place holder) values for cluster start and end points
+    kstart = -1
+    kend = -1
+    # Going through each value of x
+    for i, xi in enumerate(x):
+        if xi == xval:
+            # Assigning cluster starting point
+            if kstart == -1:
+                kstart = i
+            # Assigning cluster end point for particular case
+            # when there is an xval in the last position of x
+            if i == len(x)-1:
+                kend = i
+        else:
+            # Assigning cluster end point
+            if kstart != -1 and kend == -1:
+                kend = i-1
+        # Updating cluster information list
+        # and resetting kstart and kend
+        if kstart != -1 and kend != -1:
+            a.append(kstart)
+            a.append(kend)
+            kstart = -1
+            kend = -1
+    # Assigning indeces of cluster starting points
+    # (Every other point starting from position 0)
+    i0 = a[0:-1:2]
+    # Assigning cluster sizes
+    # (Every other point starting from position 1)
+    clustersize = list(np.array(a[1::2]) - np.array(i0) + 1)
+    # Case where cluster size is ZERO
+    if len(i0) == 0:
+        i0 = []
+        clustersize = []
+    return i0, clustersize
+
+
+# Assigning some test parameters
+ntests = 2000  # Number of random masks
+nmax = 50  # Maximum mask length
+rng = np.random.default_rng(0)
+
+# Building test cases (edge cases first)
+cases = [
+    np.array([], dtype=int),
+    np.zeros(10, dtype=int),
+    np.ones(10, dtype=int),
+    np.array([1, 0, 0, 1]),
+    np.array([1, 1, 0, 1, 1]),
+    np.array([0, 1, 0, 1, 0]),
+]
+for _ in range(ntests):
+    x = rng.integers(0, 2, rng.integers(1, nmax+1))
+    # Forcing clusters at one or both ends in part of the tests
+    ends = rng.integers(0, 4)
+    if ends & 1:
+        x[0] = 1
+    if ends & 2:
+        x[-1] = 1
+    cases.append(x)
+
+# Comparing implementations
+nends = 0
+for x in cases:
+    i0ref, sizeref = find_cluster_loop(x, 1)
+    i0, size = find_cluster(x, 1)
+    assert i0 == [int(i) for i in i0ref], x
+    assert size == [int(n) for n in sizeref], x
+    if len(x) > 0 and (x[0] == 1 or x[-1] == 1):
+        nends += 1
+print('Equivalence: {} masks OK ({} with clusters at the ends)'.format(
+    len(cases), nends))
+
+# Comparing execution times
+x = np.int32(np.round(rng.random(100000)+0.1))
+tloop = min(timeit.repeat(lambda: find_cluster_loop(x, 1), number=1, repeat=5))
+tvect = min(timeit.repeat(lambda: find_cluster(x, 1), number=1, repeat=5))
+print('Loop:       {:.1f} ms'.format(1000*tloop))
+print('Vectorized: {:.1f} ms'.format(1000*tvect))
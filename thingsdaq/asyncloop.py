@@ -0,0 +1,347 @@
+"""
+asyncloop.py contains classes that are used to run sensors, periodic control
+tasks, and user interface/event handlers as coroutines sharing one asyncio
+event loop.
+
+This lets a single process serve many slow devices (displays, buttons,
+ultrasonic sensors) concurrently, without threads or busy-waiting loops.
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+"""
+import asyncio
+import inspect
+import numpy as np
+
+
+async def _call(func, *args):
+    # Calls a function or a coroutine function
+    result = func(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class PeriodicTask:
+    """
+    The class to represent a periodic coroutine task.
+
+    The task deadlines are calculated from the start time (``k*period``), so
+    timing errors don't accumulate. If an execution takes longer than one
+    period, the deadlines that already passed are counted as missed and the
+    task resumes at the most recent one.
+
+    Tasks are usually created with `Runtime.add_periodic`, but they can also
+    be awaited directly:
+
+        >>> from asyncloop import PeriodicTask
+        >>> task = PeriodicTask(update_display, 0.5, tstop=10)
+        >>> await task.run()
+
+    :param func: The task function or coroutine function. It's called with
+        the time since the task start (s) as its only argument.
+    :type func: callable
+
+    :param period: The task period (s).
+    :type period: float
+
+    :param tstop: The task duration (s). Default value is ``inf``.
+    :type tstop: float
+
+    :param name: The task name used in the report.
+        Default value is the function name.
+    :type name: str
+
+    """
+    def __init__(self, func, period, tstop=np.inf, name=None):
+        """
+        Class constructor.
+
+        """
+        if period <= 0:
+            raise Exception('"period" must be positive.')
+        self.func = func
+        self.period = period
+        self.tstop = tstop
+        self.name = name if name else getattr(func, '__name__', 'task')
+        self.nticks = 0  # Number of executions
+        self.nmissed = 0  # Number of missed deadlines
+        self.maxlateness = 0  # Maximum delay with respect to deadline (s)
+
+    async def run(self, tstart=None):
+        """
+        Run the task until `tstop`.
+
+        :param tstart: The event loop time used as the task start time.
+            Default value is the current event loop time.
+        :type tstart: float
+
+        >>> await task.run()
+
+        """
+        loop = asyncio.get_running_loop()
+        if tstart is None:
+            tstart = loop.time()
+        k = 0
+        while k*self.period <= self.tstop:
+            # Waiting for the deadline without blocking other coroutines
+            tdeadline = tstart + k*self.period
+            delay = tdeadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tcurr = loop.time() - tstart
+            lateness = tcurr - k*self.period
+            if lateness > self.maxlateness:
+                self.maxlateness = lateness
+            self.nticks += 1
+            await _call(self.func, tcurr)
+            # Finding next deadline, skipping the ones that already passed
+            k += 1
+            klate = int((loop.time() - tstart) // self.period)
+            if klate > k:
+                self.nmissed += klate - k
+                k = klate
+
+    def report(self):
+        """
+        Print the task execution statistics.
+
+        >>> task.report()
+
+        """
+        print('{:s}: Runs = {:d} , Missed = {:d} , Max lateness (ms) = {:0.3f}'
+            .format(self.name, self.nticks, self.nmissed, 1000*self.maxlateness))
+
+
+class Runtime:
+    """
+    The class to represent an asyncio runtime for data acquisition and
+    control.
+
+    Periodic tasks, long-running coroutines (e.g. sensor readers), and
+    device event handlers are registered and then run concurrently in one
+    event loop until `tstop` or until `stop` is called.
+
+    Read an ultrasonic sensor, update a display, and handle a button:
+
+        >>> from asyncloop import Runtime
+        >>> runtime = Runtime(tstop=60)
+        >>> runtime.add_periodic(read_distance, 0.1)
+        >>> runtime.add_periodic(update_display, 0.5)
+        >>> runtime.on_event(button, 'when_activated', reset_display)
+        >>> runtime.run()
+        >>> runtime.report()
+
+    :param tstop: The execution time (s). Default value is ``inf``.
+    :type tstop: float
+
+    """
+    def __init__(self, tstop=np.inf):
+        """
+        Class constructor.
+
+        """
+        self._tstop = tstop
+        self._periodic = []  # Periodic tasks
+        self._coroutines = []  # (coroutine function, arguments)
+        self._events = []  # (device, event attribute, handler)
+        self._loop = None
+        self._stopevent = None
+        self._handlers = None  # Running (or failed) event handler tasks
+
+    @property
+    def tasks(self):
+        """
+        Contains the list of periodic tasks (`read only`).
+
+        """
+        return list(self._periodic)
+
+    def add_periodic(self, func, period, name=None):
+        """
+        Register a periodic task.
+
+        :param func: The task function or coroutine function. It's called
+            with the time since the runtime start (s) as its only argument.
+        :type func: callable
+
+        :param period: The task period (s).
+        :type period: float
+
+        :param name: The task name used in the report.
+            Default value is the function name.
+        :type name: str
+
+        :returns: The task object (with its execution statistics).
+        :rtype: PeriodicTask
+
+        >>> runtime.add_periodic(update_display, 0.5)
+
+        """
+        task = PeriodicTask(func, period, self._tstop, name)
+        self._periodic.append(task)
+        return task
+
+    def add_coroutine(self, func, *args):
+        """
+        Register a coroutine function that runs concurrently with the
+        periodic tasks. It's cancelled when the runtime stops.
+
+        :param func: The coroutine function.
+        :type func: coroutine function
+
+        :param args: The coroutine function arguments.
+
+        >>> async def blink(led):
+                while True:
+                    led.toggle()
+                    await asyncio.sleep(0.5)
+        >>> runtime.add_coroutine(blink, led)
+
+        """
+        self._coroutines.append((func, args))
+
+    def on_event(self, device, event, handler):
+        """
+        Register a handler for a GPIO Zero device event.
+
+        GPIO Zero calls device event callbacks from its own threads, so the
+        handler is scheduled to run in the event loop instead.
+
+        :param device: The GPIO Zero device.
+        :type device: gpiozero.Device
+
+        :param event: The name of the device event attribute, e.g.
+            ``'when_activated'`` or ``'when_pressed'``.
+        :type event: str
+
+        :param handler: The handler function or coroutine function.
+            It's called without arguments.
+        :type handler: callable
+
+        >>> runtime.on_event(button, 'when_pressed', reset_display)
+
+        """
+        self._events.append((device, event, handler))
+
+    def stop(self):
+        """
+        Stop the runtime (e.g. from within a task or handler).
+
+        >>> runtime.stop()
+
+        """
+        if self._stopevent is not None:
+            self._stopevent.set()
+
+    async def run_blocking(self, func, *args):
+        """
+        Run a blocking function in a worker thread without blocking the
+        event loop, and return its result.
+
+        :param func: The blocking function.
+        :type func: callable
+
+        :param args: The function arguments.
+
+        >>> value = await runtime.run_blocking(read_sensor)
+
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, func, *args)
+
+    async def main(self):
+        """
+        Run the registered tasks (coroutine version of `run`).
+
+        >>> await runtime.main()
+
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopevent = asyncio.Event()
+        self._handlers = set()
+        # Connecting device events to the event loop
+        for device, event, handler in self._events:
+            setattr(device, event, self._make_callback(handler))
+        # Starting tasks with a common start time
+        tstart = self._loop.time()
+        periodic = [
+            asyncio.ensure_future(task.run(tstart)) for task in self._periodic]
+        others = [
+            asyncio.ensure_future(func(*args))
+            for func, args in self._coroutines]
+        # Stopping the runtime if a coroutine fails
+        for future in others:
+            future.add_done_callback(self._stop_on_error)
+        # Waiting for tstop, a stop request, or the end of periodic tasks
+        waiters = [asyncio.ensure_future(self._stopevent.wait())]
+        if periodic:
+            waiters.append(asyncio.ensure_future(asyncio.gather(*periodic)))
+        timeout = None if np.isinf(self._tstop) else self._tstop
+        await asyncio.wait(
+            waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        # Disconnecting device events and cancelling remaining tasks
+        for device, event, _ in self._events:
+            setattr(device, event, None)
+        handlers = list(self._handlers)
+        self._handlers = None
+        futures = waiters + periodic + others + handlers
+        for future in futures:
+            future.cancel()
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        self._stopevent = None
+        # Raising the first error of a task, coroutine, or event handler
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(
+                    result, asyncio.CancelledError):
+                raise result
+
+    def run(self):
+        """
+        Run the registered tasks until `tstop` or until `stop` is called.
+        If a periodic task, a coroutine, or an event handler raises an
+        exception, the runtime stops and the exception is raised.
+
+        >>> runtime.run()
+
+        """
+        asyncio.run(self.main())
+
+    def report(self):
+        """
+        Print the execution statistics of each periodic task.
+
+        >>> runtime.report()
+
+        """
+        for task in self._periodic:
+            task.report()
+
+    def _stop_on_error(self, future):
+        # Stops the runtime when a coroutine ends with an error
+        if not future.cancelled() and future.exception() is not None:
+            self.stop()
+
+    def _start_handler(self, handler):
+        # Runs an event handler as a task (ignored while stopping)
+        if self._handlers is None:
+            return
+        future = asyncio.ensure_future(_call(handler))
+        self._handlers.add(future)
+        future.add_done_callback(self._handler_done)
+
+    def _handler_done(self, future):
+        # Keeps the handler tasks that failed, so `main` raises their error
+        if future.cancelled() or future.exception() is None:
+            if self._handlers is not None:
+                self._handlers.discard(future)
+        else:
+            self.stop()
+
+    def _make_callback(self, handler):
+        # Returns a thread-safe callback that schedules `handler` in the loop
+        loop = self._loop
+        def callback():
+            loop.call_soon_threadsafe(self._start_handler, handler)
+        return callback
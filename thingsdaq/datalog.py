@@ -0,0 +1,759 @@
+"""
+datalog.py contains classes that are used to record and store the data
+of data acquisition and control loops.
+
+HDF5 files are supported if the optional ``h5py`` package is installed.
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+"""
+import os
+import time
+import queue
+import zipfile
+import threading
+import numpy as np
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+class Recorder:
+    """
+    The class to represent a preallocated columnar data recorder.
+
+    It replaces the per-sample list appends used in the execution loops
+    (``t.append(tcurr)``, ``theta.append(thetacurr)``, ...), which box every
+    value and reallocate the lists as they grow. The columns are stored in a
+    preallocated NumPy structured array sized from ``tstop/tsample``, a row
+    is recorded with a single call, and the capacity doubles if more rows are
+    needed.
+
+    Record a control loop and plot the results:
+
+        >>> from datalog import Recorder
+        >>> from utils import plot_line
+        >>> rec = Recorder(['t', 'theta', 'u'], tstop=tstop, tsample=tsample)
+        >>> for tcurr in ticker:
+                ...
+                rec.record(tcurr, thetacurr, ucurr)
+        >>> plot_line(
+                [rec['t']]*2, [rec['theta'], rec['u']],
+                yname=['Angle (deg.)', 'Output ( - )'], axes='multi')
+
+    :param columns: The list of column names.
+    :type columns: list(str)
+
+    :param tstop: The loop duration (s), used to preallocate the columns.
+    :type tstop: float
+
+    :param tsample: The loop period (s), used to preallocate the columns.
+    :type tsample: float
+
+    :param nrows: The initial number of rows. Used instead of `tstop` and
+        `tsample`. Default value is ``1000``.
+    :type nrows: int
+
+    :param dtype: The data type of the columns. A dictionary can be used to
+        assign a data type to each column. Default value is ``float``.
+    :type dtype: data-type, dict
+
+    """
+    def __init__(
+        self, columns, tstop=None, tsample=None, nrows=None, dtype=float):
+        """
+        Class constructor.
+
+        """
+        if nrows is None:
+            if (tstop is not None) and (tsample is not None):
+                nrows = int(np.floor(tstop/tsample)) + 2
+            else:
+                nrows = 1000
+        if not isinstance(dtype, dict):
+            dtype = {name: dtype for name in columns}
+        self._columns = list(columns)
+        self._dtype = np.dtype([(name, dtype[name]) for name in columns])
+        self._data = np.zeros(max(int(nrows), 1), dtype=self._dtype)
+        self._n = 0  # Number of recorded rows
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, name):
+        return self._data[name][:self._n]
+
+    @property
+    def columns(self):
+        """
+        Contains the list of column names (`read only`).
+
+        """
+        return list(self._columns)
+
+    @property
+    def capacity(self):
+        """
+        Contains the number of preallocated rows (`read only`).
+
+        """
+        return len(self._data)
+
+    def record(self, *values):
+        """
+        Record a row, with one value per column.
+
+        :param values: The row values in the column order.
+        :type values: float
+
+        >>> rec.record(tcurr, thetacurr, ucurr)
+
+        """
+        k = self._n
+        if k == len(self._data):
+            self._grow()
+        self._data[k] = values
+        self._n = k + 1
+
+    def record_block(self, *values):
+        """
+        Record a block of rows, with one array per column.
+
+        :param values: The column arrays in the column order.
+        :type values: ndarray
+
+        >>> rec.record_block(tblock, vblock)
+
+        """
+        m = len(values[0])
+        while self._n + m > len(self._data):
+            self._grow()
+        rows = self._data[self._n:self._n+m]
+        for name, value in zip(self._columns, values):
+            rows[name] = value
+        self._n += m
+
+    def _grow(self):
+        # Doubles the number of preallocated rows
+        data = np.zeros(2*len(self._data), dtype=self._dtype)
+        data[:self._n] = self._data[:self._n]
+        self._data = data
+
+    def get(self):
+        """
+        Return the recorded rows as a structured array (trimmed view).
+
+        >>> data = rec.get()
+        >>> data['t'], data['theta']
+
+        """
+        return self._data[:self._n]
+
+    def arrays(self):
+        """
+        Return the list of recorded columns as contiguous ndarrays.
+
+        >>> t, theta, u = rec.arrays()
+
+        """
+        return [np.ascontiguousarray(self[name]) for name in self._columns]
+
+    def clear(self):
+        """
+        Remove all recorded rows (the preallocated memory is kept).
+
+        >>> rec.clear()
+
+        """
+        self._n = 0
+
+    def save(self, filename):
+        """
+        Save the recorded columns to a file.
+        The file format is selected by the file extension: ``.npz`` (NumPy
+        compressed archive with one array per column) or ``.csv`` (text with a
+        header line).
+
+        :param filename: The file name.
+        :type filename: str
+
+        >>> rec.save('position_control.npz')
+
+        """
+        extension = os.path.splitext(filename)[1].lower()
+        if extension == '.npz':
+            np.savez_compressed(
+                filename, **dict(zip(self._columns, self.arrays())))
+        elif extension == '.csv':
+            np.savetxt(
+                filename, np.column_stack(self.arrays()), delimiter=',',
+                header=','.join(self._columns), comments='')
+        else:
+            raise Exception("Valid file extensions are: '.npz' or '.csv'.")
+
+
+class DataLogger:
+    """
+    The class to represent a background data logger.
+
+    Rows (or blocks of rows) are passed from the execution loop through a
+    queue to a background thread, which writes them to disk in compressed
+    chunks. Disk I/O never blocks the execution loop: if the queue is full,
+    the new data is dropped and counted instead. A new file is started when
+    the current one reaches `rotaterows` rows or `rotatetime` seconds.
+
+    Two file formats are available:
+
+        * ``'npz'``: NumPy zip archive with one compressed array per column
+          and chunk (e.g. ``t_000000``, ``t_000001``, ...)
+        * ``'h5'``: HDF5 file with one compressed, resizable dataset per
+          column (requires ``h5py``)
+
+    Use `load_log` to read the files back.
+
+    Log a pulse rate monitor run:
+
+        >>> from datalog import DataLogger
+        >>> logger = DataLogger('pulse', ['t', 'v', 'vfilt'], rotatetime=3600)
+        >>> logger.start()
+        >>> for tcurr in ticker:
+                ...
+                logger.log(tcurr, vcurr, vfiltcurr)
+        >>> logger.stop()
+        >>> logger.report()
+
+    :param basename: The base name of the files. The file names are
+        ``basename_0000.npz``, ``basename_0001.npz``, etc.
+    :type basename: str
+
+    :param columns: The list of column names.
+    :type columns: list(str)
+
+    :param fileformat: The file format: ``'npz'`` or ``'h5'``.
+        Default value is ``'npz'``.
+    :type fileformat: str
+
+    :param chunksize: The number of rows written to disk at once.
+        Default value is ``1000``.
+    :type chunksize: int
+
+    :param rotaterows: The maximum number of rows per file.
+        Default value is ``None`` (no limit).
+    :type rotaterows: int
+
+    :param rotatetime: The maximum time span of a file (s).
+        Default value is ``None`` (no limit).
+    :type rotatetime: float
+
+    :param queuesize: The maximum number of queued items (rows or blocks).
+        Default value is ``10000``.
+    :type queuesize: int
+
+    :param dtype: The data type of the columns. A dictionary can be used to
+        assign a data type to each column. Default value is ``float``.
+    :type dtype: data-type, dict
+
+    """
+    def __init__(
+        self, basename, columns, fileformat='npz', chunksize=1000,
+        rotaterows=None, rotatetime=None, queuesize=10000, dtype=float):
+        """
+        Class constructor.
+
+        """
+        if fileformat not in ['npz', 'h5']:
+            raise Exception("Valid file formats are: 'npz' or 'h5'.")
+        if (fileformat == 'h5') and (h5py is None):
+            raise Exception("The 'h5' file format requires h5py.")
+        self._basename = basename
+        self._columns = list(columns)
+        self._fileformat = fileformat
+        self._chunksize = chunksize
+        self._rotaterows = rotaterows
+        self._rotatetime = rotatetime
+        self._dtype = dtype
+        self._queue = queue.Queue(maxsize=queuesize)
+        self._thread = None
+        self._error = None
+        self._files = []
+        self._ndropped = 0  # Number of dropped rows
+        self._nwritten = 0  # Number of rows written to disk
+        self._maxqueuedepth = 0  # Maximum number of queued items
+
+    @property
+    def files(self):
+        """
+        Contains the list of file names written so far (`read only`).
+
+        """
+        return list(self._files)
+
+    @property
+    def queuedepth(self):
+        """
+        Contains the number of queued items (`read only`).
+
+        """
+        return self._queue.qsize()
+
+    @property
+    def maxqueuedepth(self):
+        """
+        Contains the maximum number of queued items (`read only`).
+
+        """
+        return self._maxqueuedepth
+
+    @property
+    def ndropped(self):
+        """
+        Contains the number of rows dropped because the queue was full
+        (`read only`).
+
+        """
+        return self._ndropped
+
+    @property
+    def nwritten(self):
+        """
+        Contains the number of rows written to disk (`read only`).
+
+        """
+        return self._nwritten
+
+    @property
+    def error(self):
+        """
+        Contains the exception that stopped the background writer thread,
+        or ``None`` (`read only`).
+
+        """
+        return self._error
+
+    def start(self):
+        """
+        Start the background writer thread.
+
+        >>> logger.start()
+
+        """
+        if self._thread is not None:
+            raise Exception('Logger is already running.')
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Write the queued data to disk and stop the background writer thread.
+
+        >>> logger.stop()
+
+        """
+        if self._thread is None:
+            return
+        # Sending stop request (the queue isn't emptied if the writer died)
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        self._thread = None
+        # Discarding rows that can't be written anymore
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        if self._error is not None:
+            raise self._error
+
+    def log(self, *values):
+        """
+        Queue a row, with one value per column. The row is dropped if the
+        queue is full. The writer thread error is raised if the thread
+        stopped because of it (see `error`).
+
+        :param values: The row values in the column order.
+        :type values: float
+
+        >>> logger.log(tcurr, vcurr, vfiltcurr)
+
+        """
+        self._put(values, 1)
+
+    def log_block(self, *values):
+        """
+        Queue a block of rows, with one array per column. The block is
+        dropped if the queue is full. The writer thread error is raised if
+        the thread stopped because of it (see `error`).
+
+        :param values: The column arrays in the column order.
+        :type values: ndarray
+
+        >>> logger.log_block(tblock, vblock, vfiltblock)
+
+        """
+        self._put([np.array(value) for value in values], len(values[0]))
+
+    def _put(self, item, nrows):
+        # Queues an item without blocking
+        if self._error is not None:
+            raise self._error
+        try:
+            self._queue.put_nowait((item, nrows))
+        except queue.Full:
+            self._ndropped += nrows
+            return
+        depth = self._queue.qsize()
+        if depth > self._maxqueuedepth:
+            self._maxqueuedepth = depth
+
+    def report(self):
+        """
+        Print the logger statistics.
+
+        >>> logger.report()
+
+        """
+        print(
+            'Rows written = {:d} , Rows dropped = {:d} , '
+            'Max queue depth = {:d} , Files = {:d}'.format(
+                self._nwritten, self._ndropped, self._maxqueuedepth,
+                len(self._files)))
+
+    def _run(self):
+        # Background writer thread
+        chunk = Recorder(
+            self._columns, nrows=self._chunksize, dtype=self._dtype)
+        self._filerows = None  # Rows in the current file (None: no file)
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                if item:
+                    values, nrows = item
+                    if nrows == 1:
+                        chunk.record(*values)
+                    else:
+                        chunk.record_block(*values)
+                # Rotating file by time
+                if (self._filerows is not None) and self._rotatetime and (
+                        time.perf_counter()-self._tfile >= self._rotatetime):
+                    self._write(chunk)
+                    self._filerows = None
+                if len(chunk) >= self._chunksize:
+                    self._write(chunk)
+            self._write(chunk)
+        except Exception as err:
+            self._error = err
+
+    def _write(self, chunk):
+        # Writes the chunk rows to the current file, rotating it by size
+        n = len(chunk)
+        i = 0
+        while i < n:
+            if self._filerows is None:
+                self._new_file()
+            m = n - i
+            if self._rotaterows:
+                m = min(m, self._rotaterows - self._filerows)
+            rows = chunk.get()[i:i+m]
+            if self._fileformat == 'npz':
+                self._write_npz(rows)
+            else:
+                self._write_h5(rows)
+            self._filerows += m
+            self._nchunks += 1
+            self._nwritten += m
+            i += m
+            if self._rotaterows and (self._filerows >= self._rotaterows):
+                self._filerows = None
+        chunk.clear()
+
+    def _new_file(self):
+        # Starts a new file
+        filename = '{:s}_{:04d}.{:s}'.format(
+            self._basename, len(self._files), self._fileformat)
+        if os.path.exists(filename):
+            os.remove(filename)
+        self._files.append(filename)
+        self._filerows = 0
+        self._nchunks = 0
+        self._tfile = time.perf_counter()
+
+    def _write_npz(self, rows):
+        # Appends one compressed array per column to the zip archive
+        with zipfile.ZipFile(
+                self._files[-1], mode='a',
+                compression=zipfile.ZIP_DEFLATED) as archive:
+            for name in self._columns:
+                arrayname = '{:s}_{:06d}.npy'.format(name, self._nchunks)
+                with archive.open(arrayname, mode='w') as file:
+                    np.lib.format.write_array(
+                        file, np.ascontiguousarray(rows[name]))
+
+    def _write_h5(self, rows):
+        # Appends the rows to the resizable column datasets
+        with h5py.File(self._files[-1], 'a') as file:
+            for name in self._columns:
+                values = rows[name]
+                if name not in file:
+                    file.create_dataset(
+                        name, data=values, maxshape=(None,),
+                        chunks=True, compression='gzip')
+                else:
+                    dataset = file[name]
+                    dataset.resize((len(dataset) + len(values),))
+                    dataset[-len(values):] = values
+
+
+def load_log(filename):
+    """
+    Load the columns of a file written by `DataLogger` or `Recorder.save`.
+    A list of files (e.g. the rotated files of a `DataLogger`) is loaded as
+    a single run.
+
+    :param filename: The file name (``.npz``, ``.h5``, or ``.csv``) or the
+        list of file names.
+    :type filename: str, list(str)
+
+    :returns: A dictionary with the column names and arrays.
+    :rtype: dict
+
+    Example
+    -------
+        >>> data = load_log('pulse_0000.npz')
+        >>> plot_line(data['t'], data['vfilt'])
+
+    """
+    if not isinstance(filename, str):
+        runs = [load_log(filenamei) for filenamei in filename]
+        return {
+            name: np.concatenate([run[name] for run in runs])
+            for name in runs[0]}
+    columns = {}
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.h5':
+        if h5py is None:
+            raise Exception("Reading '.h5' files requires h5py.")
+        with h5py.File(filename, 'r') as file:
+            for name in file:
+                columns[name] = file[name][:]
+        return columns
+    if extension == '.csv':
+        data = np.genfromtxt(filename, delimiter=',', names=True)
+        return {name: data[name] for name in data.dtype.names}
+    # Concatenating column chunks in order (`DataLogger` chunks are named
+    # ``column_000000``, ``column_000001``, ...)
+    with np.load(filename) as archive:
+        for key in archive.files:
+            name, _, chunk = key.rpartition('_')
+            if not (name and len(chunk) == 6 and chunk.isdigit()):
+                name = key
+            columns.setdefault(name, []).append(archive[key])
+    return {name: np.concatenate(chunks) for name, chunks in columns.items()}
+
+
+class Replay:
+    """
+    The class to represent a replay source of a recorded run.
+
+    The recorded rows are emitted one at a time, either in real time (using
+    the recorded time stamps) or as fast as possible, and the recorded
+    columns are read through `ReplayChannel` objects that behave like the
+    ``MCP3008`` (``value``) and ``RotaryEncoder`` (``steps``) devices. This
+    way, an execution loop can be run offline, without hardware, to tune
+    filters and event detection, to benchmark processing throughput, or to
+    regression test a processing pipeline.
+
+    Re-run the filtered pulse rate monitor with recorded data:
+
+        >>> from datalog import Replay
+        >>> replay = Replay('pulse_0000.npz')
+        >>> vch = replay.channel('v', scale=1/vref)
+        >>> for tcurr in replay:
+                valuecurr = vref * vch.value
+                ...
+        >>> replay.report()
+
+    :param source: The recorded run: a file name (or list of file names)
+        accepted by `load_log`, a `Recorder`, or a dictionary of arrays.
+    :type source: str, list(str), Recorder, dict
+
+    :param tname: The name of the time column (s). Default value is ``'t'``.
+    :type tname: str
+
+    :param realtime: Emits the rows at the recorded times if ``True``, or
+        as fast as possible if ``False``. Default value is ``False``.
+    :type realtime: bool
+
+    :param speed: The replay speed factor used in real time (e.g. ``2`` runs
+        twice as fast as recorded). Default value is ``1``.
+    :type speed: float
+
+    :param tspin: The time before a row is due when the replay stops
+        sleeping and starts spinning (s). Default value is ``0.0003``.
+    :type tspin: float
+
+    """
+    def __init__(
+        self, source, tname='t', realtime=False, speed=1, tspin=0.0003):
+        """
+        Class constructor.
+
+        """
+        if isinstance(source, Recorder):
+            columns = dict(zip(source.columns, source.arrays()))
+        elif isinstance(source, dict):
+            columns = {
+                name: np.asarray(value) for name, value in source.items()}
+        else:
+            columns = load_log(source)
+        if tname not in columns:
+            raise Exception('Time column "{:s}" not found.'.format(tname))
+        self._columns = columns
+        self._t = columns[tname]
+        self._realtime = realtime
+        self._speed = speed
+        self._tspin = tspin
+        self._k = -1  # Index of the current row
+        self._elapsed = 0  # Duration of the last replay (s)
+
+    def __len__(self):
+        return len(self._t)
+
+    def __iter__(self):
+        t = self._t
+        self._k = -1
+        self._elapsed = 0
+        tstart = time.perf_counter()
+        for k in range(len(t)):
+            if self._realtime:
+                self._wait(tstart + (t[k]-t[0])/self._speed)
+            self._k = k
+            yield t[k]
+        self._elapsed = time.perf_counter() - tstart
+
+    def _wait(self, tdeadline):
+        # Sleeps and then spins until `tdeadline`
+        tsleep = tdeadline - time.perf_counter() - self._tspin
+        if tsleep > 0:
+            time.sleep(tsleep)
+        while time.perf_counter() < tdeadline:
+            pass
+
+    @property
+    def columns(self):
+        """
+        Contains the list of recorded column names (`read only`).
+
+        """
+        return list(self._columns)
+
+    @property
+    def k(self):
+        """
+        Contains the index of the current row (`read only`).
+
+        """
+        return self._k
+
+    def get(self, name):
+        """
+        Return a recorded column.
+
+        :param name: The column name.
+        :type name: str
+
+        >>> v = replay.get('v')
+
+        """
+        return self._columns[name]
+
+    def channel(self, name, scale=1, offset=0):
+        """
+        Return a device-like object that reads a recorded column at the
+        current row.
+
+        :param name: The column name.
+        :type name: str
+
+        :param scale: The factor applied to the recorded values.
+            Default value is ``1``.
+        :type scale: float
+
+        :param offset: The offset added to the scaled recorded values.
+            Default value is ``0``.
+        :type offset: float
+
+        >>> vch = replay.channel('v', scale=1/vref)
+        >>> encoder = replay.channel('steps')
+
+        """
+        if name not in self._columns:
+            raise Exception('Column "{:s}" not found.'.format(name))
+        return ReplayChannel(self, name, scale, offset)
+
+    def report(self):
+        """
+        Print the number of replayed rows and the replay throughput.
+
+        >>> replay.report()
+
+        """
+        nrows = self._k + 1
+        rate = nrows/self._elapsed if self._elapsed > 0 else np.inf
+        print('Rows = {:d} , Time (s) = {:0.3f} , Rows/s = {:0.0f}'.format(
+            nrows, self._elapsed, rate))
+
+
+class ReplayChannel:
+    """
+    The class to represent a device that reads a recorded column of a
+    `Replay` source at its current row. Channels are created with
+    `Replay.channel`.
+
+    It can be used in place of an ``MCP3008`` (``value``) or a
+    ``RotaryEncoder`` (``steps``) object.
+
+    """
+    def __init__(self, replay, name, scale, offset):
+        """
+        Class constructor.
+
+        """
+        self._replay = replay
+        self._data = scale*replay.get(name).astype(float) + offset
+
+    @property
+    def value(self):
+        """
+        Contains the (scaled) recorded value at the current row
+        (`read only`).
+
+        """
+        return self._data[max(self._replay._k, 0)]
+
+    @property
+    def steps(self):
+        """
+        Contains the (scaled) recorded value at the current row, rounded to
+        the nearest integer (`read only`).
+
+        """
+        return int(round(self.value))
+
+    def close(self):
+        """
+        Release the channel (does nothing, kept for device compatibility).
+
+        >>> vch.close()
+
+        """
+        pass
@@ -0,0 +1,56 @@
+""" post_fastpid_test.py
+
+Checks that FastPID returns the same outputs as PID and compares the
+execution time of their control methods.
+
+The controllers are run side by side with random gains, output limits, and
+derivative filter response times, for random sequences of set point,
+measurement, and feed-forward values.
+
+Note: Use the gpiozero_extended.py module located in the same folder as
+this file.
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+
+"""
+import timeit
+import numpy as np
+from gpiozero_extended import PID, FastPID
+
+# Assigning some test parameters
+ntests = 200  # Number of random controller parameter sets
+nsteps = 500  # Number of control steps per parameter set
+Ts = 0.001  # Sampling period (s)
+rng = np.random.default_rng(0)
+
+# Comparing outputs
+errmax = 0
+for _ in range(ntests):
+    kp, ki, kd = rng.uniform(0, 2, 3)
+    umax = rng.uniform(0.5, 2)
+    umin = -rng.uniform(0.5, 2)
+    tau = rng.choice([0, rng.uniform(0.001, 0.05)])
+    pid = PID(Ts, kp, ki, kd, umax=umax, umin=umin, tau=tau)
+    fastpid = FastPID(Ts, kp, ki, kd, umax=umax, umin=umin, tau=tau)
+    for xsp, x, uff in rng.uniform(-1, 1, (nsteps, 3)).tolist():
+        u = pid.control(xsp, x, uff)
+        ufast = fastpid.control(xsp, x, uff)
+        errmax = max(errmax, abs(u - ufast))
+assert errmax < 1e-12, errmax
+print('Equivalence: {} x {} steps OK (max. difference = {:g})'.format(
+    ntests, nsteps, errmax))
+
+# Comparing execution times
+nruns = 100000
+pid = PID(Ts, 0.15, 0.35, 0.01, tau=0.01)
+fastpid = FastPID(Ts, 0.15, 0.35, 0.01, tau=0.01)
+tpid = min(timeit.repeat(
+    'control(1.0, 0.5)', globals={'control': pid.control},
+    number=nruns, repeat=5))/nruns
+tfast = min(timeit.repeat(
+    'control(1.0, 0.5)', globals={'control': fastpid.control},
+    number=nruns, repeat=5))/nruns
+print('PID:     {:.3f} us'.format(1e6*tpid))
+print('FastPID: {:.3f} us ({:.2f}x)'.format(1e6*tfast, tpid/tfast))
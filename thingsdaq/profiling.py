@@ -0,0 +1,532 @@
+"""
+profiling.py contains classes that are used to measure the timing quality
+of data acquisition and control loops.
+
+Instead of storing every timestamp and plotting ``1000*np.diff(t)`` at the
+end of a run, the loop timing is recorded in fixed-size histograms, so the
+percentiles can be obtained at any time using constant memory.
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+"""
+import math
+import time
+import functools
+import contextlib
+import numpy as np
+
+
+class Histogram:
+    """
+    The class to represent a fixed-size histogram with logarithmic bins
+    (HDR-style).
+
+    Bins grow geometrically, so any recorded value between `vmin` and `vmax`
+    is represented with a relative error smaller than `precision`, using a
+    constant amount of memory. The count, mean, minimum, and maximum values
+    are exact.
+
+    Create a histogram and record values:
+
+        >>> from profiling import Histogram
+        >>> h = Histogram()
+        >>> h.record(0.0102)
+        >>> h.percentile(99)
+
+    :param vmin: The smallest value with full resolution. Smaller values are
+        counted in the first bin. Default value is ``1e-6``.
+    :type vmin: float
+
+    :param vmax: The largest value with full resolution. Larger values are
+        counted in the last bin. Default value is ``10``.
+    :type vmax: float
+
+    :param precision: The relative resolution of the bins.
+        Default value is ``0.01``.
+    :type precision: float
+
+    """
+    def __init__(self, vmin=1e-6, vmax=10, precision=0.01):
+        """
+        Class constructor.
+
+        """
+        if not 0 < vmin < vmax:
+            raise Exception('"vmin" and "vmax" must satisfy 0 < vmin < vmax.')
+        self._vmin = vmin
+        self._logstep = math.log1p(precision)
+        self._nbins = int(math.ceil(math.log(vmax/vmin)/self._logstep)) + 2
+        self._counts = np.zeros(self._nbins, dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        """
+        Remove all recorded values.
+
+        >>> h.reset()
+
+        """
+        self._counts[:] = 0
+        self._count = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+
+    def record(self, value):
+        """
+        Record a value.
+
+        :param value: The value. Negative values are recorded as ``0``.
+        :type value: float
+
+        >>> h.record(0.0102)
+
+        """
+        if value < self._vmin:
+            i = 0
+            if value < 0:
+                value = 0.0
+        else:
+            i = int(math.log(value/self._vmin)/self._logstep) + 1
+            if i >= self._nbins:
+                i = self._nbins - 1
+        self._counts[i] += 1
+        self._count += 1
+        self._sum += value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    @property
+    def count(self):
+        """
+        Contains the number of recorded values (`read only`).
+
+        """
+        return self._count
+
+    @property
+    def mean(self):
+        """
+        Contains the mean of the recorded values (`read only`).
+
+        """
+        return self._sum/self._count if self._count else math.nan
+
+    @property
+    def min(self):
+        """
+        Contains the smallest recorded value (`read only`).
+
+        """
+        return self._min if self._count else math.nan
+
+    @property
+    def max(self):
+        """
+        Contains the largest recorded value (`read only`).
+
+        """
+        return self._max if self._count else math.nan
+
+    def percentile(self, p):
+        """
+        Return a percentile of the recorded values.
+        The value is the upper edge of the bin containing the percentile,
+        limited to the recorded minimum and maximum values.
+
+        :param p: The percentile between ``0`` and ``100``.
+        :type p: float
+
+        >>> h.percentile(99.9)
+
+        """
+        if self._count == 0:
+            return math.nan
+        rank = max(1, int(math.ceil(p/100*self._count)))
+        i = int(np.searchsorted(np.cumsum(self._counts), rank))
+        value = self._vmin*math.exp(i*self._logstep)
+        return min(max(value, self._min), self._max)
+
+    def percentiles(self, p=(50, 99, 99.9)):
+        """
+        Return a dictionary with percentiles of the recorded values.
+        The maximum value is included with the key ``'max'``.
+
+        :param p: The percentiles between ``0`` and ``100``.
+            Default value is ``(50, 99, 99.9)``.
+        :type p: tuple(float)
+
+        >>> h.percentiles()
+
+        """
+        values = {'p{:g}'.format(pi): self.percentile(pi) for pi in p}
+        values['max'] = self.max
+        return values
+
+
+class LoopTimer:
+    """
+    The class to represent an execution loop timing recorder.
+
+    Three quantities are recorded per iteration in histograms:
+
+        * ``period``: time between consecutive iteration starts
+        * ``compute``: time between the start and the end of the iteration
+        * ``lateness``: delay of the iteration start with respect to the
+          grid tick following the previous iteration (only if `tsample`
+          is used)
+
+    Whole periods skipped by late iterations are counted in `missed`.
+
+    Instrument an execution loop with the polling idiom:
+
+        >>> from profiling import LoopTimer
+        >>> timer = LoopTimer(tsample)
+        >>> while tcurr <= tstop:
+                ...
+                if (np.floor(tcurr/tsample) - np.floor(tprev/tsample)) == 1:
+                    timer.start()
+                    ...
+                    timer.stop()
+        >>> timer.report()
+
+    Or use it with a ``Ticker``, which calls `start` and `stop`:
+
+        >>> ticker = Ticker(tsample, tstop, timer=LoopTimer())
+
+    :param tsample: The loop period (s), used to calculate the lateness
+        with respect to a grid that starts at the first iteration.
+        Default value is ``None``.
+    :type tsample: float
+
+    """
+    def __init__(self, tsample=None):
+        """
+        Class constructor.
+
+        """
+        self._tsample = tsample
+        self.period = Histogram()
+        self.compute = Histogram()
+        self.lateness = Histogram()
+        self.reset()
+
+    def reset(self):
+        """
+        Remove all recorded values.
+
+        >>> timer.reset()
+
+        """
+        self.period.reset()
+        self.compute.reset()
+        self.lateness.reset()
+        self._tfirst = None  # Start time of the first iteration
+        self._tstart = None  # Start time of the current iteration
+        self._tick = -1  # Grid index of the current iteration
+        self.missed = 0  # Number of skipped grid periods
+
+    def start(self, lateness=None, missed=0):
+        """
+        Mark the start of a loop iteration.
+
+        :param lateness: The delay of the iteration with respect to its
+            deadline (s). It's calculated from `tsample` if ``None``.
+        :type lateness: float
+
+        :param missed: The number of periods skipped before the iteration.
+            Only used if `lateness` is given. Default value is ``0``.
+        :type missed: int
+
+        >>> timer.start()
+
+        """
+        tnow = time.perf_counter()
+        if self._tfirst is None:
+            self._tfirst = tnow
+        elif self._tstart is not None:
+            self.period.record(tnow - self._tstart)
+        if lateness is None and self._tsample:
+            # Deadline is the grid tick following the previous iteration
+            self._tick += 1
+            lateness = tnow - self._tfirst - self._tick*self._tsample
+            # Counting skipped periods (rounded, to tolerate timing jitter)
+            # and moving on to the current tick
+            missed = max(0, round(lateness/self._tsample))
+            self.missed += missed
+            self._tick += missed
+        else:
+            self.missed += missed
+        if lateness is not None:
+            self.lateness.record(lateness)
+        self._tstart = tnow
+
+    def stop(self):
+        """
+        Mark the end of a loop iteration.
+
+        >>> timer.stop()
+
+        """
+        if self._tstart is not None:
+            self.compute.record(time.perf_counter() - self._tstart)
+
+    def percentiles(self, p=(50, 99, 99.9)):
+        """
+        Return a dictionary with the percentiles of the recorded period,
+        compute, and lateness values (s).
+
+        :param p: The percentiles between ``0`` and ``100``.
+            Default value is ``(50, 99, 99.9)``.
+        :type p: tuple(float)
+
+        >>> timer.percentiles()['period']['p99']
+
+        """
+        return {
+            'period': self.period.percentiles(p),
+            'compute': self.compute.percentiles(p),
+            'lateness': self.lateness.percentiles(p)}
+
+    def report(self, p=(50, 99, 99.9)):
+        """
+        Print the percentiles of the recorded values (ms).
+
+        :param p: The percentiles between ``0`` and ``100``.
+            Default value is ``(50, 99, 99.9)``.
+        :type p: tuple(float)
+
+        >>> timer.report()
+
+        """
+        for name, values in self.percentiles(p).items():
+            print('{:s} (ms):'.format(name.capitalize()), ' , '.join(
+                '{:s} = {:0.3f}'.format(key, 1000*value)
+                for key, value in values.items()))
+        if self._tsample or self.missed:
+            print('Missed periods:', self.missed)
+
+
+class _Stage:
+    """
+    The class to represent a timed stage (context manager).
+
+    """
+    __slots__ = ('hist', '_t0')
+
+    def __init__(self):
+        self.hist = Histogram()
+        self._t0 = 0
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.record(time.perf_counter() - self._t0)
+        return False
+
+
+class _Instrumented:
+    """
+    The class to represent an object with profiled methods, for objects
+    whose methods can't be replaced (e.g. ``__slots__``).
+
+    """
+    def __init__(self, obj, methods):
+        object.__setattr__(self, '_obj', obj)
+        self.__dict__.update(methods)
+
+    def __getattr__(self, name):
+        return getattr(self._obj, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._obj, name, value)
+
+
+class StageProfiler:
+    """
+    The class to represent a profiler that attributes the execution time
+    of a control loop to named stages.
+
+    The time spent in each stage is recorded in a ``Histogram``, so the
+    statistics (min/mean/max/p99) use constant memory. When the profiler is
+    disabled, `stage` returns a do-nothing context manager and the functions
+    wrapped by `profile` are called directly, so the instrumentation can stay
+    in the code at nearly zero cost.
+
+    Profile stages of a position control loop:
+
+        >>> from profiling import StageProfiler
+        >>> profiler = StageProfiler()
+        >>> for tcurr in ticker:
+                with profiler.stage('encoder'):
+                    theta = motor.get_angle()
+                with profiler.stage('pid'):
+                    u = pid.control(thetasp, theta)
+                with profiler.stage('output'):
+                    motor.set_output(u)
+        >>> profiler.report()
+
+    Profile the methods of ``Motor``, ``PID``, or ``DAC`` objects:
+
+        >>> profiler.instrument(motor, ['get_angle', 'set_output'])
+        >>> profiler.instrument(pid, ['control'])
+        >>> fastpid = profiler.instrument(fastpid, ['control'])
+
+    :param enabled: Records the stage times if ``True``.
+        Default value is ``True``.
+    :type enabled: bool
+
+    .. note::
+        A stage can't be nested inside another stage with the same name.
+
+    """
+    _nullstage = contextlib.nullcontext()
+
+    def __init__(self, enabled=True):
+        """
+        Class constructor.
+
+        """
+        self.enabled = enabled
+        self._stages = {}
+
+    def _get_stage(self, name):
+        # Returns the stage object, creating it if needed
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage()
+        return stage
+
+    def stage(self, name):
+        """
+        Return a context manager that records the time spent in a stage.
+
+        :param name: The stage name.
+        :type name: str
+
+        >>> with profiler.stage('pid'):
+                u = pid.control(thetasp, theta)
+
+        """
+        if not self.enabled:
+            return self._nullstage
+        return self._get_stage(name)
+
+    def profile(self, name=None):
+        """
+        Return a decorator that records the execution time of a function
+        as a stage.
+
+        :param name: The stage name. Default value is the function name.
+        :type name: str
+
+        >>> @profiler.profile()
+            def calc_setpoint(t):
+                ...
+
+        """
+        def decorator(func):
+            stage = self._get_stage(name or func.__qualname__)
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with stage:
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def instrument(self, obj, methods, prefix=None):
+        """
+        Record the execution time of methods of an object as stages.
+        Only the given object is affected (not its class).
+
+        :param obj: The object (e.g. ``Motor``, ``PID``, or ``DAC``).
+        :type obj: object
+
+        :param methods: The list of method names.
+        :type methods: list(str)
+
+        :param prefix: The stage name prefix.
+            Default value is the object class name.
+        :type prefix: str
+
+        :returns: The instrumented object. It's the given object, unless its
+            methods can't be replaced (e.g. ``FastPID``, which uses
+            ``__slots__``). In that case, it's a wrapper that forwards all
+            other attribute access to the given object.
+        :rtype: object
+
+        >>> profiler.instrument(mymotor, ['get_angle', 'set_output'])
+        >>> mypid = profiler.instrument(FastPID(0.01, 0.15, 0.35, 0.01),
+                                        ['control'])
+
+        """
+        if prefix is None:
+            prefix = type(obj).__name__
+        wrapped = {}
+        for method in methods:
+            func = getattr(obj, method)
+            name = '{:s}.{:s}'.format(prefix, method)
+            wrapped[method] = self.profile(name)(func)
+        try:
+            for method, func in wrapped.items():
+                setattr(obj, method, func)
+        except AttributeError:
+            # Object has no instance dictionary (e.g. uses __slots__)
+            obj = _Instrumented(obj, wrapped)
+        return obj
+
+    def reset(self):
+        """
+        Remove all recorded stage times.
+
+        >>> profiler.reset()
+
+        """
+        for stage in self._stages.values():
+            stage.hist.reset()
+
+    def stats(self, p=99):
+        """
+        Return a dictionary with the statistics of each stage (s).
+
+        :param p: The percentile between ``0`` and ``100`` included in the
+            statistics. Default value is ``99``.
+        :type p: float
+
+        >>> profiler.stats()['pid']['max']
+
+        """
+        values = {}
+        for name, stage in self._stages.items():
+            hist = stage.hist
+            values[name] = {
+                'count': hist.count,
+                'min': hist.min,
+                'mean': hist.mean,
+                'max': hist.max,
+                'p{:g}'.format(p): hist.percentile(p)}
+        return values
+
+    def report(self, p=99):
+        """
+        Print the statistics of each stage (ms).
+
+        :param p: The percentile between ``0`` and ``100`` included in the
+            statistics. Default value is ``99``.
+        :type p: float
+
+        >>> profiler.report()
+
+        """
+        for name, values in self.stats(p).items():
+            print('{:s}: count = {:d} ,'.format(name, values.pop('count')),
+                ' , '.join(
+                    '{:s} = {:0.3f}'.format(key, 1000*value)
+                    for key, value in values.items()))
@@ -0,0 +1,250 @@
+"""
+realtime.py contains a helper class that is used to reduce the timing jitter
+of control loops running on a Raspberry Pi (or any Linux computer).
+
+The helper is opt-in and every setting is applied on a best-effort basis.
+Settings that require privileges (e.g. running with ``sudo``) or that are not
+available on the platform are skipped and reported, so the same script runs
+on an ordinary Linux box.
+
+To isolate a CPU core on a Raspberry Pi, add ``isolcpus=3`` to the end of the
+line in ``/boot/cmdline.txt`` and reboot.
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+"""
+import os
+import gc
+import ctypes
+import ctypes.util
+import numpy as np
+
+# mlockall flags (Linux)
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+
+
+class RealTime:
+    """
+    The class to represent the real-time setup of the running process.
+
+    When entered (as a context manager) or when `start` is called, it:
+
+        * pins the process to a single CPU core (an isolated core if any)
+        * requests the ``SCHED_FIFO`` real-time scheduling policy
+        * locks the process memory with ``mlockall`` to avoid page faults
+        * pre-faults the given NumPy buffers (touching every memory page)
+        * disables the Python garbage collector
+
+    Everything is restored when leaving the context (or calling `stop`),
+    and the garbage collection that was postponed during the loop is done.
+
+    Run a control loop with real-time settings:
+
+        >>> from realtime import RealTime
+        >>> with RealTime(buffers=[t, theta, u]) as rt:
+                for tcurr in ticker:
+                    ...
+        >>> rt.report()
+
+    :param cpu: The CPU core used to run the process. If ``None``, the first
+        isolated core is used or, if there are none, the last core.
+    :type cpu: int
+
+    :param priority: The ``SCHED_FIFO`` priority (``1`` to ``99``).
+        Default value is ``50``. If ``None``, the scheduling policy isn't
+        changed.
+    :type priority: int
+
+    :param lockmemory: Locks the process memory if ``True``.
+        Default value is ``True``.
+    :type lockmemory: bool
+
+    :param buffers: The list of ndarrays to be pre-faulted.
+        Default value is ``None``.
+    :type buffers: list(ndarray)
+
+    :param disablegc: Disables the garbage collector if ``True``.
+        Default value is ``True``.
+    :type disablegc: bool
+
+    """
+    def __init__(
+        self, cpu=None, priority=50, lockmemory=True, buffers=None,
+        disablegc=True):
+        """
+        Class constructor.
+
+        """
+        self._cpu = cpu
+        self._priority = priority
+        self._lockmemory = lockmemory
+        self._buffers = buffers if buffers is not None else []
+        self._disablegc = disablegc
+        self._applied = {}
+        self._restore = []  # Functions that undo the applied settings
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    @property
+    def applied(self):
+        """
+        Contains a dictionary with the result of each setting (`read only`).
+        The values are ``True`` if the setting was applied or a string with
+        the reason why it wasn't.
+
+        """
+        return dict(self._applied)
+
+    def start(self):
+        """
+        Apply the real-time settings.
+
+        >>> rt.start()
+
+        """
+        self._applied = {}
+        self._restore = []
+        self._applied['affinity'] = self._set_affinity()
+        if self._priority is not None:
+            self._applied['sched_fifo'] = self._set_scheduler()
+        if self._lockmemory:
+            self._applied['mlockall'] = self._lock_memory()
+        if self._buffers:
+            self._applied['prefault'] = self._prefault()
+        if self._disablegc:
+            gcenabled = gc.isenabled()
+            gc.disable()
+            if gcenabled:
+                self._restore.append(gc.enable)
+            self._applied['gc_disabled'] = True
+
+    def stop(self):
+        """
+        Restore the original settings and run the garbage collector.
+
+        >>> rt.stop()
+
+        """
+        while self._restore:
+            try:
+                self._restore.pop()()
+            except OSError:
+                pass
+        if self._disablegc:
+            gc.collect()
+
+    def collect(self):
+        """
+        Run the garbage collector (e.g. in between runs).
+
+        >>> rt.collect()
+
+        """
+        gc.collect()
+
+    def report(self):
+        """
+        Print the result of each setting.
+
+        >>> rt.report()
+
+        """
+        for name, value in self._applied.items():
+            print('{:s}: {:s}'.format(
+                name, 'applied' if value is True else 'not applied ({:s})'.format(
+                    value)))
+
+    def _set_affinity(self):
+        # Pins the process to a single CPU core
+        if not hasattr(os, 'sched_setaffinity'):
+            return 'not supported on this platform'
+        cpu = self._cpu
+        if cpu is None:
+            isolated = _isolated_cpus()
+            cpu = isolated[0] if isolated else max(os.sched_getaffinity(0))
+        previous = os.sched_getaffinity(0)
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError as err:
+            return str(err)
+        self._restore.append(lambda: os.sched_setaffinity(0, previous))
+        return True
+
+    def _set_scheduler(self):
+        # Requests the SCHED_FIFO scheduling policy
+        if not hasattr(os, 'SCHED_FIFO'):
+            return 'not supported on this platform'
+        policy = os.sched_getscheduler(0)
+        param = os.sched_getparam(0)
+        try:
+            os.sched_setscheduler(
+                0, os.SCHED_FIFO, os.sched_param(self._priority))
+        except OSError as err:
+            return str(err)
+        self._restore.append(lambda: os.sched_setscheduler(0, policy, param))
+        return True
+
+    def _lock_memory(self):
+        # Locks current and future process memory pages in RAM
+        libc = _load_libc()
+        if libc is None or not hasattr(libc, 'mlockall'):
+            return 'not supported on this platform'
+        if libc.mlockall(_MCL_CURRENT | _MCL_FUTURE) != 0:
+            return os.strerror(ctypes.get_errno())
+        self._restore.append(libc.munlockall)
+        return True
+
+    def _prefault(self):
+        # Writes one byte per memory page of each buffer (keeping its value)
+        pagesize = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        for buffer in self._buffers:
+            if not (buffer.flags.c_contiguous and buffer.flags.writeable):
+                return 'buffers must be contiguous and writeable'
+            data = buffer.reshape(-1).view(np.uint8)
+            data[::pagesize] = data[::pagesize]
+        return True
+
+
+def _isolated_cpus():
+    # Returns the list of online CPU cores isolated from the kernel scheduler
+    # (isolated cores aren't in the default affinity mask, but a process can
+    # still be pinned to them)
+    isolated = _read_cpulist('/sys/devices/system/cpu/isolated')
+    online = _read_cpulist('/sys/devices/system/cpu/online')
+    return [cpu for cpu in isolated if cpu in online]
+
+
+def _read_cpulist(filename):
+    # Returns the list of CPU cores in a kernel CPU list file (e.g. "0,2-3")
+    try:
+        with open(filename) as file:
+            text = file.read().strip()
+    except OSError:
+        return []
+    cpus = []
+    for item in filter(None, text.split(',')):
+        if '-' in item:
+            first, last = item.split('-')
+            cpus.extend(range(int(first), int(last)+1))
+        else:
+            cpus.append(int(item))
+    return cpus
+
+
+def _load_libc():
+    # Returns the C library (or None if it can't be loaded)
+    name = ctypes.util.find_library('c')
+    if name is None:
+        return None
+    try:
+        return ctypes.CDLL(name, use_errno=True)
+    except OSError:
+        return None
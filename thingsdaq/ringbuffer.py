@@ -0,0 +1,1145 @@
+"""
+ringbuffer.py contains circular buffer classes that are used to store the most
+recent samples of a data acquisition loop.
+
+The buffers are backed by preallocated NumPy arrays instead of Python lists,
+so that the buffer contents can be passed to NumPy/SciPy functions without
+any list concatenation or array conversion.
+
+For more information on the original list-based implementation go to:
+https://thingsdaq.org/2023/04/18/circular-buffer-in-python/
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+"""
+import os
+import json
+import math
+import heapq
+import numpy as np
+from collections import deque
+from multiprocessing import shared_memory, resource_tracker
+
+# Number of bytes reserved for the header of buffers stored in raw memory
+# (head counter, buffer size, and JSON metadata with the data type)
+_HEADER_SIZE = 1024
+
+
+class RingBuffer:
+    """
+    The class to represent a fixed-capacity circular buffer.
+
+    The data is stored in a preallocated array that is twice the buffer size.
+    Every element is written to both halves of the array (mirrored storage),
+    so the buffer elements, ordered from the oldest to the newest, are always
+    available as a contiguous slice. As a result, `get` returns a read-only
+    view of the data without allocating or copying anything.
+
+    Create a ring buffer with 200 elements:
+
+        >>> from ringbuffer import RingBuffer
+        >>> x = RingBuffer(200)
+
+    Add elements and get the buffer contents:
+
+        >>> x.add(5)
+        >>> x.extend([10, 4, 7])
+        >>> x.get()
+        array([ 5., 10.,  4.,  7.])
+
+    :param bufsize: The maximum number of elements in the buffer.
+    :type bufsize: int
+
+    :param dtype: The data type of the buffer elements.
+        Default value is ``float``.
+    :type dtype: data-type
+
+    """
+    def __init__(self, bufsize, dtype=float):
+        """
+        Class constructor.
+
+        """
+        if bufsize < 1:
+            raise Exception('"bufsize" must be a positive integer.')
+        dtype = np.dtype(dtype)
+        self._init_storage(bufsize, np.zeros(2*bufsize, dtype=dtype))
+        self._nwritten = 0  # Total number of elements added to the buffer
+
+    def _init_storage(self, bufsize, data):
+        # Assigns the (mirrored) storage array and its read-only view
+        self._bufsize = int(bufsize)
+        self._data = data
+        self._rodata = data.view()
+        self._rodata.flags.writeable = False
+
+    def __len__(self):
+        return min(self._nwritten, self._bufsize)
+
+    def __getitem__(self, key):
+        return self.get()[key]
+
+    def __array__(self, dtype=None, copy=None):
+        # Allows the buffer to be used directly as a NumPy function argument
+        data = self.get()
+        if dtype is not None:
+            data = data.astype(dtype)
+        elif copy:
+            data = data.copy()
+        return data
+
+    @property
+    def bufsize(self):
+        """
+        Contains the maximum number of elements in the buffer (`read only`).
+
+        """
+        return self._bufsize
+
+    @property
+    def dtype(self):
+        """
+        Contains the data type of the buffer elements (`read only`).
+
+        """
+        return self._data.dtype
+
+    @property
+    def full(self):
+        """
+        Contains ``True`` if the buffer is full (`read only`).
+
+        """
+        return self._nwritten >= self._bufsize
+
+    @property
+    def nwritten(self):
+        """
+        Contains the total number of elements added to the buffer since it
+        was created or last cleared (`read only`).
+
+        """
+        return self._nwritten
+
+    def add(self, x):
+        """
+        Add an element at the end of the buffer, overwriting the oldest one
+        if the buffer is full.
+
+        :param x: The element value.
+        :type x: float
+
+        >>> x.add(2.5)
+
+        """
+        n = self._bufsize
+        k = self._nwritten
+        i = k % n
+        # Writing value to both halves of the mirrored storage
+        self._data[i] = x
+        self._data[i+n] = x
+        self._nwritten = k + 1
+
+    def extend(self, values):
+        """
+        Add a block of elements at the end of the buffer.
+        If the block is longer than the buffer, only its last `bufsize`
+        elements are kept.
+
+        :param values: The element values ordered from the oldest to the newest.
+        :type values: list(float), ndarray
+
+        >>> x.extend(np.array([1.5, 2.0, 2.5]))
+
+        """
+        values = np.asarray(values, dtype=self._data.dtype)
+        m = len(values)
+        if m == 0:
+            return
+        n = self._bufsize
+        k = self._nwritten
+        # Keeping only the values that fit in the buffer
+        if m > n:
+            k += m - n
+            values = values[m-n:]
+            m = n
+        i = k % n
+        # Writing block up to the end of each half of the storage
+        m1 = min(m, n-i)
+        self._data[i:i+m1] = values[:m1]
+        self._data[i+n:i+n+m1] = values[:m1]
+        # Wrapping around the remaining values
+        m2 = m - m1
+        if m2 > 0:
+            self._data[:m2] = values[m1:]
+            self._data[n:n+m2] = values[m1:]
+        self._nwritten = k + m
+
+    def get(self):
+        """
+        Return a read-only view of the elements from the oldest to the newest.
+
+        The view shares memory with the buffer and its contents are only
+        guaranteed until the next element is added. Use ``x.get().copy()``
+        to keep a snapshot.
+
+        >>> x.get()
+
+        """
+        n = self._bufsize
+        k = self._nwritten
+        if k < n:
+            return self._rodata[:k]
+        i = k % n
+        return self._rodata[i:i+n]
+
+    def clear(self):
+        """
+        Remove all elements from the buffer.
+
+        >>> x.clear()
+
+        """
+        self._nwritten = 0
+
+
+class TimedRingBuffer(RingBuffer):
+    """
+    The class to represent a multi-channel circular buffer with a shared
+    timestamp column.
+
+    Each buffer element is a record containing the sample time ``t`` and one
+    value per channel, so all channels are always kept in lockstep. Because
+    the timestamps are monotonic, the samples within a time window are found
+    with a binary search on the ordered time axis and are returned as a
+    read-only view (no scanning or copying).
+
+    Create a buffer for the sensor voltage and its filtered value:
+
+        >>> from ringbuffer import TimedRingBuffer
+        >>> x = TimedRingBuffer(200, ['v', 'vfilt'])
+
+    Add a sample and get the data of the last 5 seconds:
+
+        >>> x.add(tcurr, vcurr, vfiltcurr)
+        >>> data = x.last(5)
+        >>> data['t'], data['vfilt']
+
+    :param bufsize: The maximum number of samples in the buffer.
+    :type bufsize: int
+
+    :param channels: The list of channel names.
+        The name ``'t'`` is reserved for the timestamp column.
+    :type channels: list(str)
+
+    :param dtype: The data type of the channel values.
+        Default value is ``float``.
+    :type dtype: data-type
+
+    """
+    def __init__(self, bufsize, channels, dtype=float):
+        """
+        Class constructor.
+
+        """
+        if 't' in channels:
+            raise Exception('"t" is reserved for the timestamp column.')
+        self._channels = list(channels)
+        fields = [('t', np.float64)] + [(name, dtype) for name in channels]
+        super().__init__(bufsize, dtype=fields)
+        self._tlast = -np.inf  # Timestamp of the newest sample
+
+    @property
+    def channels(self):
+        """
+        Contains the list of channel names (`read only`).
+
+        """
+        return list(self._channels)
+
+    def add(self, t, *values):
+        """
+        Add a sample at the end of the buffer, overwriting the oldest one
+        if the buffer is full.
+
+        :param t: The sample time. It can't be smaller than the previous one.
+        :type t: float
+
+        :param values: The sample values, one per channel.
+        :type values: float
+
+        >>> x.add(1.2, 0.75, 0.02)
+
+        """
+        if t < self._tlast:
+            raise Exception('Sample times must be monotonic.')
+        super().add((t,) + values)
+        self._tlast = t
+
+    def extend(self, t, *values):
+        """
+        Add a block of samples at the end of the buffer.
+
+        :param t: The sample times ordered from the oldest to the newest.
+        :type t: list(float), ndarray
+
+        :param values: The sample values, one array per channel.
+        :type values: list(float), ndarray
+
+        >>> x.extend(tblock, vblock, vfiltblock)
+
+        """
+        t = np.asarray(t, dtype=np.float64)
+        if len(t) == 0:
+            return
+        if (t[0] < self._tlast) or np.any(np.diff(t) < 0):
+            raise Exception('Sample times must be monotonic.')
+        if len(values) != len(self._channels):
+            raise Exception('One array per channel is required.')
+        # Assembling records
+        rows = np.empty(len(t), dtype=self.dtype)
+        rows['t'] = t
+        for name, value in zip(self._channels, values):
+            rows[name] = value
+        super().extend(rows)
+        self._tlast = t[-1]
+
+    def window(self, t0, t1):
+        """
+        Return a read-only view of the samples with ``t0 <= t <= t1``.
+
+        :param t0: The window start time.
+        :type t0: float
+
+        :param t1: The window end time.
+        :type t1: float
+
+        >>> data = x.window(10, 15)
+
+        """
+        data = self.get()
+        t = data['t']
+        i0 = np.searchsorted(t, t0, side='left')
+        i1 = np.searchsorted(t, t1, side='right')
+        return data[i0:i1]
+
+    def last(self, seconds):
+        """
+        Return a read-only view of the samples within the last `seconds`
+        relative to the newest sample, i.e. ``t > tnewest - seconds``.
+
+        :param seconds: The window length (s).
+        :type seconds: float
+
+        >>> data = x.last(20)
+
+        """
+        data = self.get()
+        i0 = np.searchsorted(data['t'], self._tlast-seconds, side='right')
+        return data[i0:]
+
+    def clear(self):
+        """
+        Remove all samples from the buffer.
+
+        >>> x.clear()
+
+        """
+        super().clear()
+        self._tlast = -np.inf
+
+
+class SPSCRingBuffer(RingBuffer):
+    """
+    The class to represent a single-producer/single-consumer circular buffer.
+
+    The buffer lets a sampling thread (producer) write samples while a
+    processing thread (consumer) reads them, without any locking. The head
+    (elements written) and tail (elements read) counters are plain integers
+    that only grow, and each one is assigned by a single thread only. Since
+    the producer publishes the head only after the data is stored, and never
+    writes over elements that haven't been read yet, the consumer always sees
+    consistent data.
+
+    When the consumer falls behind and the buffer is full, new samples are
+    dropped (the sampling loop is never delayed) and counted as overruns.
+
+    Create a buffer and share it between a sampler and a processing thread:
+
+        >>> import threading
+        >>> from ringbuffer import SPSCRingBuffer
+        >>> x = SPSCRingBuffer(1000)
+        >>> def sampler():
+                while running:
+                    x.add(vch.value)
+        >>> threading.Thread(target=sampler).start()
+
+    Read the new samples from the processing thread:
+
+        >>> values = x.read()
+        >>> x.overruns
+
+    :param bufsize: The maximum number of unread elements in the buffer.
+    :type bufsize: int
+
+    :param dtype: The data type of the buffer elements.
+        Default value is ``float``.
+    :type dtype: data-type
+
+    """
+    def __init__(self, bufsize, dtype=float):
+        """
+        Class constructor.
+
+        """
+        super().__init__(bufsize, dtype=dtype)
+        self._nread = 0  # Total number of elements read (tail)
+        self._overruns = 0  # Total number of dropped elements
+
+    @property
+    def available(self):
+        """
+        Contains the number of elements that haven't been read (`read only`).
+
+        """
+        return self._nwritten - self._nread
+
+    @property
+    def nread(self):
+        """
+        Contains the total number of elements read by the consumer
+        (`read only`).
+
+        """
+        return self._nread
+
+    @property
+    def overruns(self):
+        """
+        Contains the total number of elements that were dropped because the
+        consumer fell behind (`read only`).
+
+        """
+        return self._overruns
+
+    def add(self, x):
+        """
+        Add an element at the end of the buffer (producer side).
+        The element is dropped if there are `bufsize` unread elements.
+
+        :param x: The element value.
+        :type x: float
+
+        :returns: ``True`` if the element was stored.
+        :rtype: bool
+
+        >>> x.add(2.5)
+
+        """
+        if self._nwritten - self._nread >= self._bufsize:
+            self._overruns += 1
+            return False
+        # Storing data before publishing the new head
+        super().add(x)
+        return True
+
+    def extend(self, values):
+        """
+        Add a block of elements at the end of the buffer (producer side).
+        The elements that don't fit in the free space are dropped.
+
+        :param values: The element values ordered from the oldest to the newest.
+        :type values: list(float), ndarray
+
+        :returns: The number of elements stored.
+        :rtype: int
+
+        >>> x.extend(np.array([1.5, 2.0, 2.5]))
+
+        """
+        values = np.asarray(values, dtype=self._data.dtype)
+        nfree = self._bufsize - (self._nwritten - self._nread)
+        if len(values) > nfree:
+            self._overruns += len(values) - nfree
+            values = values[:nfree]
+        super().extend(values)
+        return len(values)
+
+    def read(self, maxcount=None):
+        """
+        Return a copy of the unread elements, from the oldest to the newest,
+        and mark them as read (consumer side).
+
+        :param maxcount: The maximum number of elements to read.
+            All unread elements are returned if ``None``.
+        :type maxcount: int
+
+        >>> values = x.read()
+
+        """
+        n = self._bufsize
+        k = self._nread
+        # Taking a snapshot of the head published by the producer
+        count = self._nwritten - k
+        if (maxcount is not None) and (count > maxcount):
+            count = maxcount
+        i = k % n
+        values = self._data[i:i+count].copy()
+        # Releasing the slots back to the producer
+        self._nread = k + count
+        return values
+
+    def clear(self):
+        """
+        Remove all elements from the buffer and reset the overrun counter.
+        Must not be called while the producer is running.
+
+        >>> x.clear()
+
+        """
+        super().clear()
+        self._nread = 0
+        self._overruns = 0
+
+
+def _write_header(buf, bufsize, dtype):
+    # Writes the buffer header to raw memory and returns the counter array
+    meta = json.dumps(
+        {'dtype': np.lib.format.dtype_to_descr(dtype)}).encode('utf-8')
+    if len(meta) > _HEADER_SIZE - 24:
+        raise Exception('Data type description is too long for the header.')
+    head = np.ndarray(3, dtype=np.int64, buffer=buf)
+    head[:] = [0, bufsize, len(meta)]
+    np.ndarray(len(meta), dtype=np.uint8, buffer=buf, offset=24)[:] = (
+        np.frombuffer(meta, dtype=np.uint8))
+    return head
+
+
+def _read_header(buf):
+    # Reads the buffer header from raw memory
+    head = np.ndarray(3, dtype=np.int64, buffer=buf)
+    meta = np.ndarray(int(head[2]), dtype=np.uint8, buffer=buf, offset=24)
+    meta = json.loads(meta.tobytes().decode('utf-8'))
+    descr = meta['dtype']
+    if isinstance(descr, list):
+        descr = [tuple(field) for field in descr]
+    dtype = np.lib.format.descr_to_dtype(descr)
+    return head, int(head[1]), dtype
+
+
+class _RawRingBuffer(RingBuffer):
+    """
+    The base class for ring buffers stored in raw memory (with a header)
+    that can be accessed by other processes.
+
+    """
+    def _setup_raw(self, buf, bufsize=None, dtype=None, readonly=False):
+        # Creates the header (if `bufsize` is given) or reads it,
+        # and maps the mirrored data storage after the header
+        if bufsize is not None:
+            self._head = _write_header(buf, bufsize, np.dtype(dtype))
+        else:
+            self._head, bufsize, dtype = _read_header(buf)
+        data = np.ndarray(
+            2*bufsize, dtype=dtype, buffer=buf, offset=_HEADER_SIZE)
+        if readonly:
+            self._head.flags.writeable = False
+            data.flags.writeable = False
+        self._readonly = readonly
+        self._init_storage(bufsize, data)
+
+    @staticmethod
+    def _nbytes(bufsize, dtype):
+        # Returns the raw memory size needed for the buffer
+        return _HEADER_SIZE + 2*bufsize*np.dtype(dtype).itemsize
+
+    @property
+    def _nwritten(self):
+        # Total number of elements added to the buffer (stored in the header)
+        return int(self._head[0])
+
+    @_nwritten.setter
+    def _nwritten(self, value):
+        self._head[0] = value
+
+    @property
+    def readonly(self):
+        """
+        Contains ``True`` if the buffer was opened for reading only
+        (`read only`).
+
+        """
+        return self._readonly
+
+    def add(self, x):
+        """
+        Add an element at the end of the buffer, overwriting the oldest one
+        if the buffer is full.
+
+        :param x: The element value.
+        :type x: float
+
+        >>> x.add(2.5)
+
+        """
+        if self._readonly:
+            raise Exception('Buffer was opened for reading only.')
+        super().add(x)
+
+    def extend(self, values):
+        """
+        Add a block of elements at the end of the buffer.
+        If the block is longer than the buffer, only its last `bufsize`
+        elements are kept.
+
+        :param values: The element values ordered from the oldest to the newest.
+        :type values: list(float), ndarray
+
+        >>> x.extend(np.array([1.5, 2.0, 2.5]))
+
+        """
+        if self._readonly:
+            raise Exception('Buffer was opened for reading only.')
+        super().extend(values)
+
+    def clear(self):
+        """
+        Remove all elements from the buffer.
+
+        >>> x.clear()
+
+        """
+        if self._readonly:
+            raise Exception('Buffer was opened for reading only.')
+        super().clear()
+
+    def snapshot(self):
+        """
+        Return a copy of the elements from the oldest to the newest.
+
+        Unlike `get`, which returns a live view, the elements that were
+        overwritten by the writer while being copied are discarded, so the
+        result is always consistent.
+
+        >>> data = x.snapshot()
+
+        """
+        n = self._bufsize
+        k0 = self._nwritten
+        if k0 < n:
+            data = self._rodata[:k0].copy()
+        else:
+            i = k0 % n
+            data = self._rodata[i:i+n].copy()
+        # Discarding the oldest elements that may have been overwritten
+        nover = self._nwritten - k0 - (n - len(data))
+        if nover > 0:
+            data = data[nover:]
+        return data
+
+    def _release(self):
+        # Drops the array references to the raw memory
+        self._head = None
+        self._data = None
+        self._rodata = None
+
+
+def _attach_shm(name):
+    # Opens an existing shared memory block without registering it with the
+    # resource tracker, which would unlink it when this process ends
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python versions before 3.13 always register the block. Unregistering
+        # it afterwards would also drop the creator's registration when the
+        # tracker is shared (e.g. spawned processes), so it's skipped instead
+        register = resource_tracker.register
+        def skip_register(name, rtype):
+            if rtype != 'shared_memory':
+                register(name, rtype)
+        resource_tracker.register = skip_register
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class _SharedBytes:
+    """
+    The class to represent the shared memory block as a NumPy byte array
+    base object.
+
+    The views of the buffer keep a reference to this object, so the shared
+    memory is only closed after the last view is released.
+
+    """
+    def __init__(self, shm):
+        self._shm = shm
+        address = np.frombuffer(shm.buf, dtype=np.uint8).ctypes.data
+        self.__array_interface__ = {
+            'shape': (shm.size,), 'typestr': '|u1',
+            'data': (address, False), 'version': 3}
+
+    def __del__(self):
+        self._shm.close()
+
+
+class SharedRingBuffer(_RawRingBuffer):
+    """
+    The class to represent a circular buffer in shared memory.
+
+    The buffer is created by the acquisition process and can be opened by
+    name in other processes (e.g. for SciPy post-processing), which access the
+    data as NumPy views of the same memory, without pickling or copying.
+    It has the same `add`/`get` methods as `RingBuffer`.
+
+    Create a buffer in the acquisition process:
+
+        >>> from ringbuffer import SharedRingBuffer
+        >>> x = SharedRingBuffer(1000)
+        >>> x.add(vref*vch.value)
+
+    Open the buffer for reading in an analysis process:
+
+        >>> y = SharedRingBuffer(name=x.name, readonly=True)
+        >>> vfilt = signal.filtfilt(b, a, y.get())
+
+    :param bufsize: The maximum number of elements in the buffer.
+        Only used when creating a new buffer.
+    :type bufsize: int
+
+    :param dtype: The data type of the buffer elements.
+        Only used when creating a new buffer. Default value is ``float``.
+    :type dtype: data-type
+
+    :param name: The name of an existing shared memory buffer to be opened.
+        A new buffer is created if ``None``.
+    :type name: str
+
+    :param readonly: Opens the buffer for reading only if ``True``.
+        Default value is ``False``.
+    :type readonly: bool
+
+    .. note::
+        Only one process can add elements to the buffer. Always use `unlink`
+        in the process that created the buffer, after all processes are done,
+        to release the shared memory.
+
+    """
+    def __init__(self, bufsize=None, dtype=float, name=None, readonly=False):
+        """
+        Class constructor.
+
+        """
+        if name is None:
+            # Creating new shared memory block
+            if (bufsize is None) or (bufsize < 1):
+                raise Exception('"bufsize" must be a positive integer.')
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=self._nbytes(bufsize, dtype))
+            self._setup_raw(self._shm_bytes(), bufsize, dtype, readonly)
+        else:
+            # Attaching to existing shared memory block
+            self._shm = _attach_shm(name)
+            self._setup_raw(self._shm_bytes(), readonly=readonly)
+
+    def __del__(self):
+        """
+        Class destructor.
+
+        """
+        self.close()
+
+    def _shm_bytes(self):
+        # Returns a byte array of the shared memory that closes it when the
+        # array and all views of it are no longer in use (NumPy doesn't hold
+        # a buffer export, so the memory can't be closed before that)
+        return np.asarray(_SharedBytes(self._shm))
+
+    @property
+    def name(self):
+        """
+        Contains the shared memory name used to open the buffer in other
+        processes (`read only`).
+
+        """
+        return self._shm.name
+
+    def close(self):
+        """
+        Close access to the shared memory from this object.
+        The memory is unmapped after the views returned by `get` are no
+        longer in use.
+
+        >>> x.close()
+
+        """
+        if getattr(self, '_head', None) is not None:
+            self._release()
+
+    def unlink(self):
+        """
+        Close and release the shared memory block.
+        It should be called only once, by the process that created the buffer.
+
+        >>> x.unlink()
+
+        """
+        self.close()
+        self._shm.unlink()
+
+
+class MappedRingBuffer(_RawRingBuffer):
+    """
+    The class to represent a circular buffer stored in a memory-mapped file.
+
+    The file contains a small header (buffer size, head counter, and data
+    type with the channel names) followed by the buffer data. The buffer
+    contents survive a crash or restart of the logging script, and the file
+    can be opened read-only by another process (e.g. a dashboard), which
+    accesses the data with zero copy. It has the same `add`/`get` methods as
+    `RingBuffer`.
+
+    Create (or reopen after a restart) a 24 hour buffer sampled at 1 Hz:
+
+        >>> from ringbuffer import MappedRingBuffer
+        >>> x = MappedRingBuffer('temp.rbf', 86400, channels=['t', 'temp'])
+        >>> x.add((tcurr, tempcurr))
+
+    Open the buffer file for reading in a dashboard process:
+
+        >>> y = MappedRingBuffer('temp.rbf', readonly=True)
+        >>> data = y.get()
+        >>> data['t'], data['temp']
+
+    :param filename: The buffer file name.
+    :type filename: str
+
+    :param bufsize: The maximum number of elements in the buffer.
+        Only used when the file doesn't exist yet.
+        If the file exists, its buffer size must match this value.
+    :type bufsize: int
+
+    :param dtype: The data type of the buffer elements (or of each channel).
+        If the file exists, its data type must match this value.
+        Default value is ``None`` (``float`` for a new file).
+    :type dtype: data-type
+
+    :param channels: The list of channel names. Each buffer element is a
+        record with one field per channel if it's used.
+        If the file exists, its channels must match this value.
+    :type channels: list(str)
+
+    :param readonly: Opens the buffer file for reading only if ``True``.
+        Default value is ``False``.
+    :type readonly: bool
+
+    .. note::
+        Only one process can add elements to the buffer.
+
+    """
+    def __init__(
+        self, filename, bufsize=None, dtype=None, channels=None,
+        readonly=False):
+        """
+        Class constructor.
+
+        """
+        self._filename = filename
+        if channels is not None:
+            dtype = [
+                (name, float if dtype is None else dtype) for name in channels]
+        if os.path.exists(filename):
+            # Opening existing buffer file
+            mode = 'r' if readonly else 'r+'
+            self._mmap = np.memmap(filename, dtype=np.uint8, mode=mode)
+            self._setup_raw(self._mmap, readonly=readonly)
+            if (bufsize is not None) and (bufsize != self._bufsize):
+                raise Exception(
+                    'Buffer file "{}" has a size of {} elements.'.format(
+                        filename, self._bufsize))
+            if (dtype is not None) and (np.dtype(dtype) != self._data.dtype):
+                raise Exception(
+                    'Buffer file "{}" has a data type of {}.'.format(
+                        filename, self._data.dtype))
+        else:
+            # Creating new buffer file
+            if readonly:
+                raise Exception(
+                    'Buffer file "{}" does not exist.'.format(filename))
+            if (bufsize is None) or (bufsize < 1):
+                raise Exception('"bufsize" must be a positive integer.')
+            if dtype is None:
+                dtype = float
+            self._mmap = np.memmap(
+                filename, dtype=np.uint8, mode='w+',
+                shape=self._nbytes(bufsize, dtype))
+            self._setup_raw(self._mmap, bufsize, dtype)
+
+    def __del__(self):
+        """
+        Class destructor.
+
+        """
+        self.close()
+
+    @property
+    def filename(self):
+        """
+        Contains the buffer file name (`read only`).
+
+        """
+        return self._filename
+
+    @property
+    def channels(self):
+        """
+        Contains the list of channel names or ``None`` if the buffer elements
+        are not records (`read only`).
+
+        """
+        names = self._data.dtype.names
+        return list(names) if names else None
+
+    def flush(self):
+        """
+        Write the buffer changes to disk.
+
+        >>> x.flush()
+
+        """
+        if not self._readonly:
+            self._mmap.flush()
+
+    def close(self):
+        """
+        Write the buffer changes to disk and close the file.
+
+        >>> x.close()
+
+        """
+        if getattr(self, '_mmap', None) is not None:
+            self.flush()
+            self._release()
+            self._mmap = None
+
+
+class WindowStats(RingBuffer):
+    """
+    The class to represent a circular buffer that keeps running statistics
+    of its elements (sliding window).
+
+    The statistics are updated every time an element is added, instead of
+    being recalculated over the whole buffer:
+
+        * mean and variance: Welford's algorithm with removal, O(1)
+        * min and max: monotonic deques, O(1) amortized
+        * median: two heaps with lazy removal, O(log n)
+
+    Create a 10 second window for signals sampled at 1 kHz:
+
+        >>> from ringbuffer import WindowStats
+        >>> x = WindowStats(10000)
+
+    Add an element and get the window statistics:
+
+        >>> x.add(vcurr)
+        >>> x.mean, x.std, x.min, x.max, x.median
+
+    :param bufsize: The maximum number of elements in the window.
+    :type bufsize: int
+
+    """
+    def __init__(self, bufsize):
+        """
+        Class constructor.
+
+        """
+        super().__init__(bufsize, dtype=float)
+        self._reset_stats()
+
+    def _reset_stats(self):
+        # Resets the running statistics
+        self._mean = 0.0  # Running mean
+        self._m2 = 0.0  # Running sum of squared differences from the mean
+        self._maxq = deque()  # (index, value) with decreasing values
+        self._minq = deque()  # (index, value) with increasing values
+        self._lo = []  # Max-heap of (-value, index) for the lower half
+        self._hi = []  # Min-heap of (value, index) for the upper half
+        self._nlo = 0  # Number of valid elements in the lower half
+        self._nhi = 0  # Number of valid elements in the upper half
+        self._side = [0] * self._bufsize  # Heap of each element (0: lo, 1: hi)
+
+    @property
+    def mean(self):
+        """
+        Contains the mean of the elements in the window (`read only`).
+
+        """
+        return self._mean if len(self) else math.nan
+
+    @property
+    def var(self):
+        """
+        Contains the (population) variance of the elements in the window
+        (`read only`).
+
+        """
+        n = len(self)
+        return max(self._m2, 0.0)/n if n else math.nan
+
+    @property
+    def std(self):
+        """
+        Contains the (population) standard deviation of the elements in the
+        window (`read only`).
+
+        """
+        return math.sqrt(self.var)
+
+    @property
+    def max(self):
+        """
+        Contains the largest element in the window (`read only`).
+
+        """
+        return self._maxq[0][1] if self._maxq else math.nan
+
+    @property
+    def min(self):
+        """
+        Contains the smallest element in the window (`read only`).
+
+        """
+        return self._minq[0][1] if self._minq else math.nan
+
+    @property
+    def median(self):
+        """
+        Contains the median of the elements in the window (`read only`).
+
+        """
+        if self._nlo == 0:
+            return math.nan
+        if self._nlo > self._nhi:
+            return -self._lo[0][0]
+        return (self._hi[0][0] - self._lo[0][0])/2
+
+    def add(self, x):
+        """
+        Add an element at the end of the window, removing the oldest one
+        if the window is full, and update the statistics.
+
+        :param x: The element value.
+        :type x: float
+
+        >>> x.add(2.5)
+
+        """
+        x = float(x)
+        n = self._bufsize
+        k = self._nwritten
+        # Updating mean and variance
+        if k >= n:
+            xold = self._data[k % n]
+            meanold = self._mean
+            self._mean += (x - xold)/n
+            self._m2 += (x - xold)*(x - self._mean + xold - meanold)
+        else:
+            d = x - self._mean
+            self._mean += d/(k + 1)
+            self._m2 += d*(x - self._mean)
+        # Updating min and max
+        self._update_extremes(x, k)
+        # Updating median
+        self._update_median(x, k)
+        super().add(x)
+
+    def extend(self, values):
+        """
+        Add a block of elements at the end of the window and update the
+        statistics.
+
+        :param values: The element values ordered from the oldest to the newest.
+        :type values: list(float), ndarray
+
+        >>> x.extend(np.array([1.5, 2.0, 2.5]))
+
+        """
+        for x in values:
+            self.add(x)
+
+    def clear(self):
+        """
+        Remove all elements from the window and reset the statistics.
+
+        >>> x.clear()
+
+        """
+        super().clear()
+        self._reset_stats()
+
+    def _update_extremes(self, x, k):
+        # Adds element `k` to the monotonic deques and removes expired ones
+        kold = k - self._bufsize
+        maxq = self._maxq
+        while maxq and maxq[-1][1] <= x:
+            maxq.pop()
+        maxq.append((k, x))
+        if maxq[0][0] <= kold:
+            maxq.popleft()
+        minq = self._minq
+        while minq and minq[-1][1] >= x:
+            minq.pop()
+        minq.append((k, x))
+        if minq[0][0] <= kold:
+            minq.popleft()
+
+    def _update_median(self, x, k):
+        # Adds element `k` to the heaps, lazily removing the expired element
+        n = self._bufsize
+        kold = k - n
+        if kold >= 0:
+            if self._side[kold % n] == 0:
+                self._nlo -= 1
+            else:
+                self._nhi -= 1
+        # Inserting new element in the appropriate half
+        self._prune(kold)
+        if (self._nlo == 0) or (x <= -self._lo[0][0]):
+            heapq.heappush(self._lo, (-x, k))
+            self._side[k % n] = 0
+            self._nlo += 1
+        else:
+            heapq.heappush(self._hi, (x, k))
+            self._side[k % n] = 1
+            self._nhi += 1
+        # Rebalancing halves so that nhi <= nlo <= nhi+1
+        while self._nlo > self._nhi + 1:
+            value, i = heapq.heappop(self._lo)
+            heapq.heappush(self._hi, (-value, i))
+            self._side[i % n] = 1
+            self._nlo -= 1
+            self._nhi += 1
+            self._prune(kold)
+        while self._nhi > self._nlo:
+            value, i = heapq.heappop(self._hi)
+            heapq.heappush(self._lo, (-value, i))
+            self._side[i % n] = 0
+            self._nhi -= 1
+            self._nlo += 1
+            self._prune(kold)
+        # Rebuilding heaps when there are too many expired elements
+        if len(self._lo) + len(self._hi) > 2*n:
+            self._lo = [item for item in self._lo if item[1] > kold]
+            self._hi = [item for item in self._hi if item[1] > kold]
+            heapq.heapify(self._lo)
+            heapq.heapify(self._hi)
+
+    def _prune(self, kold):
+        # Removes expired elements from the top of the heaps
+        while self._lo and self._lo[0][1] <= kold:
+            heapq.heappop(self._lo)
+        while self._hi and self._hi[0][1] <= kold:
+            heapq.heappop(self._hi)
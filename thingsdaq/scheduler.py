@@ -0,0 +1,445 @@
+"""
+scheduler.py contains classes that are used to run the execution loops of
+data acquisition and control scripts at a fixed period.
+
+They replace the polling idiom used in the coding examples (one per period):
+
+    >>> while tcurr <= tstop:
+            tcurr = time.perf_counter() - tstart
+            if (np.floor(tcurr/tsample) - np.floor(tprev/tsample)) == 1:
+                ...
+            tprev = tcurr
+
+which keeps the CPU at 100% and silently drops a sample whenever the loop
+takes longer than one period.
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+"""
+import time
+import numpy as np
+
+
+def _wait_until(tdeadline, tspin):
+    # Sleeps and then spins until `tdeadline` (time.perf_counter value),
+    # returning the current time
+    tsleep = tdeadline - time.perf_counter() - tspin
+    if tsleep > 0:
+        time.sleep(tsleep)
+    tnow = time.perf_counter()
+    while tnow < tdeadline:
+        tnow = time.perf_counter()
+    return tnow
+
+
+class Ticker:
+    """
+    The class to represent a drift-free periodic loop timer.
+
+    The tick deadlines are calculated from the start time (``k*tsample``),
+    so timing errors don't accumulate. While waiting for the next deadline,
+    the ticker sleeps (releasing the CPU) and then spins for the last
+    `tspin` seconds to achieve an accurate tick time.
+
+    If the loop body takes longer than one period, the ticks whose deadlines
+    have already passed are counted as missed and the loop resumes at the
+    most recent deadline (or runs all of them late if `catchup` is
+    ``True``).
+
+    Run an execution loop every 10 ms for 5 seconds:
+
+        >>> from scheduler import Ticker
+        >>> ticker = Ticker(0.01, 5)
+        >>> for tcurr in ticker:
+                x.append(vch.value)
+        >>> ticker.report()
+
+    :param tsample: The loop period (s).
+    :type tsample: float
+
+    :param tstop: The loop duration (s). The last tick happens at or before
+        `tstop`. Default value is ``inf``.
+    :type tstop: float
+
+    :param tspin: The time before the deadline when the ticker stops
+        sleeping and starts spinning (s). Default value is ``0.0003``.
+    :type tspin: float
+
+    :param catchup: Runs missed ticks (late) instead of skipping them if
+        ``True``. Default value is ``False``.
+    :type catchup: bool
+
+    :param timer: The ``profiling.LoopTimer`` object used to record the
+        loop period, compute time (loop body), and tick lateness.
+        Default value is ``None``.
+    :type timer: LoopTimer
+
+    """
+    def __init__(
+        self, tsample, tstop=np.inf, tspin=0.0003, catchup=False,
+        timer=None):
+        """
+        Class constructor.
+
+        """
+        if tsample <= 0:
+            raise Exception('"tsample" must be positive.')
+        self._tsample = tsample
+        self._tstop = tstop
+        self._tspin = tspin
+        self._catchup = catchup
+        self._timer = timer
+        self._reset_stats()
+        self._tstart = None
+
+    def _reset_stats(self):
+        # Resets tick statistics
+        self._k = -1  # Current tick index
+        self._nticks = 0  # Number of executed ticks
+        self._nmissed = 0  # Number of skipped ticks
+        self._lateness = 0  # Lateness of the current tick (s)
+        self._sumlateness = 0  # Sum of tick lateness values (s)
+        self._maxlateness = 0  # Maximum tick lateness (s)
+
+    def __iter__(self):
+        tsample = self._tsample
+        self._reset_stats()
+        self._tstart = time.perf_counter()
+        k = 0
+        missed = 0  # Number of ticks skipped before the current one
+        while k*tsample <= self._tstop:
+            # Waiting for tick deadline
+            tcurr = self._wait(self._tstart + k*tsample) - self._tstart
+            # Updating tick statistics
+            self._k = k
+            self._lateness = tcurr - k*tsample
+            self._nticks += 1
+            self._sumlateness += self._lateness
+            if self._lateness > self._maxlateness:
+                self._maxlateness = self._lateness
+            if self._timer:
+                self._timer.start(self._lateness, missed)
+                yield tcurr
+                self._timer.stop()
+            else:
+                yield tcurr
+            # Finding next tick, skipping the deadlines that already passed
+            k += 1
+            missed = 0
+            if not self._catchup:
+                klate = int((time.perf_counter()-self._tstart) // tsample)
+                if klate > k:
+                    missed = klate - k
+                    self._nmissed += missed
+                    k = klate
+
+    def _wait(self, tdeadline):
+        # Sleeps and then spins until `tdeadline`, returning the current time
+        return _wait_until(tdeadline, self._tspin)
+
+    @property
+    def tsample(self):
+        """
+        Contains the loop period (s) (`read only`).
+
+        """
+        return self._tsample
+
+    @property
+    def tstart(self):
+        """
+        Contains the ``time.perf_counter()`` value at the loop start
+        (`read only`).
+
+        """
+        return self._tstart
+
+    @property
+    def k(self):
+        """
+        Contains the index of the current tick (`read only`).
+
+        """
+        return self._k
+
+    @property
+    def lateness(self):
+        """
+        Contains the delay of the current tick with respect to its deadline
+        (s) (`read only`).
+
+        """
+        return self._lateness
+
+    @property
+    def nticks(self):
+        """
+        Contains the number of executed ticks (`read only`).
+
+        """
+        return self._nticks
+
+    @property
+    def nmissed(self):
+        """
+        Contains the number of missed (skipped) ticks (`read only`).
+
+        """
+        return self._nmissed
+
+    @property
+    def maxlateness(self):
+        """
+        Contains the maximum tick delay with respect to its deadline (s)
+        (`read only`).
+
+        """
+        return self._maxlateness
+
+    def report(self):
+        """
+        Print a summary of the loop timing.
+
+        >>> ticker.report()
+
+        """
+        meanlateness = self._sumlateness/self._nticks if self._nticks else 0
+        print(
+            'Ticks = {:d} , Missed = {:d} , '
+            'Lateness (ms): mean = {:0.3f} , max = {:0.3f}'.format(
+                self._nticks, self._nmissed,
+                1000*meanlateness, 1000*self._maxlateness))
+
+
+class Task:
+    """
+    The class to represent a periodic task run by a `Scheduler`.
+    Tasks are created with `Scheduler.add_task`.
+
+    The task execution statistics are available as attributes:
+
+        * ``nruns``: number of executions
+        * ``nskipped``: number of periods skipped because the task couldn't
+          run before its next deadline (overruns)
+        * ``ndeferred``: number of times the task was postponed because it
+          would delay a higher priority task
+        * ``texec``: recent execution time estimate (s), an exponentially
+          weighted moving average used to decide if the task is deferred
+        * ``maxexec``: maximum execution time (s)
+        * ``maxlateness``: maximum delay of an execution with respect to
+          its deadline (s)
+
+    """
+    def __init__(self, func, period, priority, name, offset, texec):
+        """
+        Class constructor.
+
+        """
+        self.func = func
+        self.period = period
+        self.priority = priority
+        self.name = name
+        self.tnext = offset  # Next deadline (s)
+        self.nruns = 0
+        self.nskipped = 0
+        self.ndeferred = 0
+        self.texec = texec
+        self.maxexec = texec
+        self.maxlateness = 0
+        self._tdeferred = None  # Time when the task was first deferred (s)
+
+    def _update_texec(self, texec):
+        # Updates the execution time estimate and statistics
+        self.texec += 0.2*(texec - self.texec)
+        if texec > self.maxexec:
+            self.maxexec = texec
+
+    def _skip_passed(self, tcurr):
+        # Moves the next deadline to the most recent one that already passed,
+        # counting the skipped periods
+        nperiods = int((tcurr - self.tnext) // self.period)
+        if nperiods > 0:
+            self.nskipped += nperiods
+            self.tnext += nperiods*self.period
+
+
+class Scheduler:
+    """
+    The class to represent a multi-rate (rate-monotonic) task scheduler.
+
+    Tasks such as sampling, control, and display are registered with their
+    own period and priority and are run from a single timing loop. When more
+    than one task is due, the highest priority task runs first. A task is
+    deferred if its recent execution time doesn't fit before the next
+    deadline of a higher priority task, so heavy low priority tasks don't
+    delay the high-rate sampling task. A task that can't run before its next
+    deadline skips that period, which is counted as an overrun. To make
+    sure every task runs, a task that has been deferred for a whole period
+    runs at the next opportunity.
+
+    By default, priorities are rate-monotonic: the shorter the period, the
+    higher the priority.
+
+    Run a sampling task at 100 Hz and a display task at 1 Hz for 60 s:
+
+        >>> from scheduler import Scheduler
+        >>> def sample(t):
+                buffer.add(t, vref*vch.value)
+        >>> def display(t):
+                tm.number(int(calc_bpm(buffer)))
+        >>> scheduler = Scheduler(tstop=60)
+        >>> scheduler.add_task(sample, 0.01)
+        >>> scheduler.add_task(display, 1, texec=0.005)
+        >>> scheduler.run()
+        >>> scheduler.report()
+
+    :param tstop: The execution time (s). Default value is ``inf``.
+    :type tstop: float
+
+    :param tspin: The time before a deadline when the scheduler stops
+        sleeping and starts spinning (s). Default value is ``0.0003``.
+    :type tspin: float
+
+    """
+    def __init__(self, tstop=np.inf, tspin=0.0003):
+        """
+        Class constructor.
+
+        """
+        self._tstop = tstop
+        self._tspin = tspin
+        self._tasks = []
+        self._running = False
+
+    @property
+    def tasks(self):
+        """
+        Contains the list of registered tasks (`read only`).
+
+        """
+        return list(self._tasks)
+
+    def add_task(
+        self, func, period, priority=None, name=None, offset=0, texec=0):
+        """
+        Register a periodic task.
+
+        :param func: The task function. It's called with the current time
+            (s since the scheduler start) as its only argument.
+        :type func: callable
+
+        :param period: The task period (s).
+        :type period: float
+
+        :param priority: The task priority (larger values have higher
+            priority). Default value is ``1/period`` (rate-monotonic).
+        :type priority: float
+
+        :param name: The task name used in the report.
+            Default value is the function name.
+        :type name: str
+
+        :param offset: The time of the first task deadline (s).
+            Default value is ``0``.
+        :type offset: float
+
+        :param texec: The expected task execution time (s), used as the
+            initial execution time estimate.
+            Default value is ``0``.
+        :type texec: float
+
+        :returns: The task object (with its execution statistics).
+        :rtype: Task
+
+        >>> scheduler.add_task(display, 1, name='display')
+
+        """
+        if period <= 0:
+            raise Exception('"period" must be positive.')
+        if priority is None:
+            priority = 1/period
+        if name is None:
+            name = getattr(func, '__name__', 'task')
+        task = Task(func, period, priority, name, offset, texec)
+        self._tasks.append(task)
+        # Keeping tasks sorted from highest to lowest priority
+        self._tasks.sort(key=lambda taski: -taski.priority)
+        return task
+
+    def stop(self):
+        """
+        Stop the scheduler (e.g. from within a task).
+
+        >>> scheduler.stop()
+
+        """
+        self._running = False
+
+    def run(self):
+        """
+        Run the registered tasks until `tstop` or until `stop` is called.
+
+        >>> scheduler.run()
+
+        """
+        if not self._tasks:
+            raise Exception('There are no tasks to run.')
+        tasks = self._tasks
+        tstart = time.perf_counter()
+        self._running = True
+        while self._running:
+            tcurr = time.perf_counter() - tstart
+            if tcurr > self._tstop:
+                break
+            # Finding highest priority task that is due
+            # (tasks are sorted by priority)
+            task = None
+            tnexthp = np.inf  # Next deadline of higher priority tasks
+            for taski in tasks:
+                if taski.tnext <= tcurr:
+                    task = taski
+                    break
+                if taski.tnext < tnexthp:
+                    tnexthp = taski.tnext
+            if task is None:
+                # Waiting for the next deadline
+                _wait_until(tstart + tnexthp, self._tspin)
+                continue
+            # Skipping periods that are already gone
+            task._skip_passed(tcurr)
+            # Deferring task if it doesn't fit before a higher priority task
+            # (for at most one task period)
+            if tcurr + task.texec > tnexthp:
+                if task._tdeferred is None:
+                    task._tdeferred = tcurr
+                if tcurr - task._tdeferred < task.period:
+                    task.ndeferred += 1
+                    _wait_until(tstart + tnexthp, self._tspin)
+                    continue
+            task._tdeferred = None
+            # Running task
+            lateness = tcurr - task.tnext
+            task.func(tcurr)
+            texec = time.perf_counter() - tstart - tcurr
+            # Updating task statistics and next deadline
+            task.nruns += 1
+            task._update_texec(texec)
+            if lateness > task.maxlateness:
+                task.maxlateness = lateness
+            task.tnext += task.period
+        self._running = False
+
+    def report(self):
+        """
+        Print the execution statistics of each task.
+
+        >>> scheduler.report()
+
+        """
+        for task in self._tasks:
+            print(
+                '{:s}: Runs = {:d} , Skipped = {:d} , Deferred = {:d} , '
+                'Max exec (ms) = {:0.3f} , Max lateness (ms) = {:0.3f}'.format(
+                    task.name, task.nruns, task.nskipped, task.ndeferred,
+                    1000*task.maxexec, 1000*task.maxlateness))
@@ -0,0 +1,491 @@
+"""
+simulation.py contains classes that are used to run the devices of
+gpiozero_extended.py (``Motor``, ``DAC``, ``LineSensor``, ``Dimmer``) and
+the execution loops that use them on any computer, without hardware.
+
+The simulated devices are built on the GPIO Zero mock pin factory
+(https://gpiozero.readthedocs.io/en/stable/api_pins.html#mock-pins).
+Device models (DC motor, RC filter, scripted inputs) read the mock output
+pins and drive the mock input pins, and a mock MCP3008 chip is attached to
+the SPI pins, so the GPIO Zero and gpiozero_extended classes are used
+unchanged.
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+"""
+import time
+import threading
+import numpy as np
+from gpiozero import Device
+from gpiozero.pins.mock import MockFactory, MockPWMPin, MockSPIDevice
+
+
+class SimFactory(MockFactory):
+    """
+    The class to represent a GPIO Zero pin factory with simulated devices.
+
+    All pins support PWM, and a `SimMCP3008` chip is attached to the SPI
+    pins (GPIO 11, 10, 9, and 8) used in the coding examples. The device
+    models are updated to the current time by a background thread (`start`)
+    or to a given time by calling `update`.
+
+    Run a motor with an encoder in closed loop without hardware:
+
+        >>> from simulation import SimFactory, MotorPlant
+        >>> from gpiozero_extended import Motor, PID
+        >>> factory = SimFactory().install()
+        >>> plant = MotorPlant(
+                factory, enable1=16, pwm1=17, pwm2=18,
+                encoder1=24, encoder2=25, encoderppr=300.8)
+        >>> mymotor = Motor(
+                enable1=16, pwm1=17, pwm2=18,
+                encoder1=24, encoder2=25, encoderppr=300.8)
+        >>> factory.start()
+        >>> for tcurr in ticker:
+                theta = mymotor.get_angle()
+                mymotor.set_output(pid.control(thetasp, theta))
+        >>> factory.stop()
+
+    :param vref: The reference voltage of the MCP3008 chip (V).
+        Default value is ``3.3``.
+    :type vref: float
+
+    """
+    def __init__(self, vref=3.3):
+        """
+        Class constructor.
+
+        """
+        super().__init__(pin_class=MockPWMPin)
+        self._models = []
+        self._lock = threading.RLock()
+        self._thread = None
+        self._running = False
+        self._tstart = time.perf_counter()
+        self._t = 0  # Simulation time of the last update (s)
+        self.adc = SimMCP3008(self, vref)
+
+    def pin(self, name, pin_class=None, **kwargs):
+        """
+        Return the mock pin, reusing it if it already exists (e.g. the SPI
+        pins created by the mock MCP3008 chip).
+
+        """
+        for _, info in self.board_info.find_pin(name):
+            if info in self.pins:
+                return self.pins[info]
+        return super().pin(name, pin_class, **kwargs)
+
+    def install(self):
+        """
+        Make the factory the default GPIO Zero pin factory and return it.
+
+        >>> factory = SimFactory().install()
+
+        """
+        Device.pin_factory = self
+        return self
+
+    def add_model(self, model):
+        """
+        Register a device model, so it's updated with the factory.
+        Models are registered when they are created.
+
+        :param model: The device model (with an ``update(t)`` method).
+        :type model: object
+
+        """
+        with self._lock:
+            self._models.append(model)
+
+    @property
+    def time(self):
+        """
+        Contains the simulation time of the last update (s) (`read only`).
+
+        """
+        return self._t
+
+    def update(self, t=None):
+        """
+        Update the device models to a simulation time.
+
+        :param t: The simulation time (s). Default value is the time since
+            the factory was created (or started).
+        :type t: float
+
+        >>> factory.update(tcurr)
+
+        """
+        with self._lock:
+            if t is None:
+                t = time.perf_counter() - self._tstart
+            for model in self._models:
+                model.update(t)
+            self._t = t
+
+    def start(self, dt=0.0005):
+        """
+        Start updating the device models in real time from a background
+        thread.
+
+        :param dt: The update period (s). Default value is ``0.0005``.
+        :type dt: float
+
+        >>> factory.start()
+
+        """
+        if self._thread is not None:
+            raise Exception('Simulation is already running.')
+        self._tstart = time.perf_counter() - self._t
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, args=(dt,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread.
+
+        >>> factory.stop()
+
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, dt):
+        # Background update loop
+        while self._running:
+            self.update()
+            time.sleep(dt)
+
+
+class SimMCP3008(MockSPIDevice):
+    """
+    The class to represent a mock MCP3008 analog-to-digital converter chip.
+    It's created by `SimFactory` and answers the ``MCP3008`` device requests
+    with the voltages of its input sources.
+
+    The input of each channel can be a constant voltage, a function of the
+    simulation time, or a device model with a ``voltage`` attribute:
+
+        >>> factory.adc.set_input(0, 1.65)
+        >>> factory.adc.set_input(1, lambda t: 1.65 + np.sin(2*np.pi*t))
+        >>> factory.adc.set_input(2, RCFilter(factory, 18))
+
+    """
+    def __init__(self, factory, vref=3.3, bits=10):
+        """
+        Class constructor.
+
+        """
+        super().__init__(11, 10, 9, 8, pin_factory=factory)
+        self._factory = factory
+        self.vref = vref
+        self._bits = bits
+        self._inputs = [0.0] * 8
+        self._state = 'idle'
+
+    def set_input(self, channel, source):
+        """
+        Assign the input source of a channel.
+
+        :param channel: The MCP3008 channel (``0`` to ``7``).
+        :type channel: int
+
+        :param source: The input voltage (V), a function of the simulation
+            time that returns the input voltage, or a device model with a
+            ``voltage`` attribute.
+        :type source: float, callable, object
+
+        """
+        self._inputs[channel] = source
+
+    def get_voltage(self, channel):
+        """
+        Return the current input voltage of a channel (V).
+
+        :param channel: The MCP3008 channel (``0`` to ``7``).
+        :type channel: int
+
+        """
+        source = self._inputs[channel]
+        if hasattr(source, 'voltage'):
+            return source.voltage
+        if callable(source):
+            return source(self._factory.time)
+        return source
+
+    def on_start(self):
+        super().on_start()
+        self._state = 'idle'
+
+    def on_bit(self):
+        # Decodes the request bits: start bit, single/differential mode bit,
+        # and channel bits, then transmits the conversion result
+        # (the mock PWM pins have float states)
+        self.rx_buf[-1] = int(self.rx_buf[-1])
+        if self._state == 'idle':
+            if self.rx_buf[-1]:
+                self._state = 'mode'
+                self.rx_buf = []
+        elif self._state == 'mode':
+            self._state = 'single' if self.rx_buf[-1] else 'diff'
+            self.rx_buf = []
+        elif self._state in ('single', 'diff'):
+            if len(self.rx_buf) == 3:
+                channel = self.rx_word()
+                voltage = self.get_voltage(channel)
+                if self._state == 'diff':
+                    voltage -= self.get_voltage(channel ^ 1)
+                voltage = min(max(voltage, 0), self.vref)
+                self.tx_word(
+                    int(round(voltage/self.vref*(2**self._bits-1))),
+                    self._bits + 2)
+                self._state = 'result'
+        elif self._state == 'result':
+            if not self.tx_buf:
+                self._state = 'idle'
+                self.rx_buf = []
+
+
+class MotorPlant:
+    """
+    The class to represent a simulated DC motor with an encoder, driven by
+    the H-bridge pins of a ``Motor`` object.
+
+    The motor speed responds to the signed PWM duty cycle as a first-order
+    system (``tau*dw/dt + w = wmax*u``), which is integrated exactly between
+    updates. The shaft angle is converted into quadrature edges on the
+    encoder pins, which are counted by the ``RotaryEncoder`` of ``Motor``.
+
+    The driver type is identified in the same way as in ``Motor``: single
+    enable with dual PWM (`pwm2` is used) or single PWM with dual enable.
+
+    :param factory: The simulation pin factory.
+    :type factory: SimFactory
+
+    :param enable1: The GPIO pin of the driver enable 1.
+    :type enable1: int or str
+
+    :param enable2: The GPIO pin of the driver enable 2.
+        This value is ignored for a single enable driver.
+    :type enable2: int or str
+
+    :param pwm1: The GPIO pin of the driver PWM 1.
+    :type pwm1: int or str
+
+    :param pwm2: The GPIO pin of the driver PWM 2.
+        This value is ignored for a single PWM driver.
+    :type pwm2: int or str
+
+    :param encoder1: The GPIO pin of the encoder phase A.
+    :type encoder1: int or str
+
+    :param encoder2: The GPIO pin of the encoder phase B.
+    :type encoder2: int or str
+
+    :param encoderppr: The number of Pulses Per Revolution (PPR) of the
+        encoder. Default value is ``300``.
+    :type encoderppr: float
+
+    :param wmax: The steady state speed at full duty cycle (rad/s).
+        Default value is ``30``.
+    :type wmax: float
+
+    :param tau: The mechanical time constant (s). Default value is ``0.05``.
+    :type tau: float
+
+    """
+    # Encoder phase (A, B) pin levels for increasing angle
+    _phases = ((1, 1), (0, 1), (0, 0), (1, 0))
+
+    def __init__(
+        self, factory, enable1=None, enable2=None, pwm1=None, pwm2=None,
+        encoder1=None, encoder2=None, encoderppr=300, wmax=30, tau=0.05):
+        """
+        Class constructor.
+
+        """
+        self._dualpwm = bool(pwm1 and pwm2)
+        self._enable1 = factory.pin(enable1)
+        self._enable2 = None if self._dualpwm else factory.pin(enable2)
+        self._pwm1 = factory.pin(pwm1)
+        self._pwm2 = factory.pin(pwm2) if self._dualpwm else None
+        if encoder1 and encoder2:
+            self._encoder = (factory.pin(encoder1), factory.pin(encoder2))
+        else:
+            self._encoder = None
+        self._ppr = encoderppr
+        self.wmax = wmax
+        self.tau = tau
+        self._t = factory.time  # Time of the last update (s)
+        self._w = 0  # Speed (rad/s)
+        self._theta = 0  # Angle (rad)
+        self._count = 0  # Encoder edge count
+        factory.add_model(self)
+
+    @property
+    def output(self):
+        """
+        Contains the signed duty cycle applied by the driver pins
+        (`read only`).
+
+        """
+        if self._dualpwm:
+            return float(self._enable1.state) * (
+                float(self._pwm1.state) - float(self._pwm2.state))
+        return float(self._pwm1.state) * (
+            float(self._enable1.state) - float(self._enable2.state))
+
+    @property
+    def speed(self):
+        """
+        Contains the motor speed (rad/s) (`read only`).
+
+        """
+        return self._w
+
+    @property
+    def angle(self):
+        """
+        Contains the exact motor angle (deg) (`read only`).
+
+        """
+        return np.degrees(self._theta)
+
+    def update(self, t):
+        """
+        Update the motor speed, angle, and encoder pins to time `t` (s).
+
+        """
+        dt = t - self._t
+        if dt <= 0:
+            return
+        self._t = t
+        # Integrating first-order speed response exactly
+        wss = self.wmax * self.output
+        decay = np.exp(-dt/self.tau)
+        self._theta += wss*dt + (self._w-wss)*self.tau*(1-decay)
+        self._w = wss + (self._w-wss)*decay
+        # Driving encoder edges (4 edges per pulse)
+        if self._encoder:
+            count = int(np.floor(self._theta/(2*np.pi)*4*self._ppr))
+            step = 1 if count > self._count else -1
+            while self._count != count:
+                self._count += step
+                pina, pinb = self._encoder
+                statea, stateb = self._phases[self._count % 4]
+                for pin, state in ((pina, statea), (pinb, stateb)):
+                    if bool(pin.state) != bool(state):
+                        pin.drive_high() if state else pin.drive_low()
+
+
+class RCFilter:
+    """
+    The class to represent the analog low-pass filter of a ``DAC`` port:
+    cascaded passive RC filters driven by a PWM pin (loading between the
+    stages is neglected). The filter output can be read back by assigning
+    the model to a `SimMCP3008` channel.
+
+    :param factory: The simulation pin factory.
+    :type factory: SimFactory
+
+    :param pin: The PWM GPIO pin of the ``DAC`` port.
+    :type pin: int or str
+
+    :param r: The filter resistance (Ohm). Default value is ``1000``.
+    :type r: float
+
+    :param c: The filter capacitance (F). Default value is ``10e-6``.
+    :type c: float
+
+    :param stages: The number of cascaded filters. Default value is ``2``.
+    :type stages: int
+
+    :param vref: The PWM output high voltage (V). Default value is ``3.3``.
+    :type vref: float
+
+    """
+    def __init__(self, factory, pin, r=1000, c=10e-6, stages=2, vref=3.3):
+        """
+        Class constructor.
+
+        """
+        self._pin = factory.pin(pin)
+        self._tau = r*c
+        self._vref = vref
+        self._v = np.zeros(stages)  # Stage output voltages (V)
+        self._t = factory.time  # Time of the last update (s)
+        factory.add_model(self)
+
+    @property
+    def voltage(self):
+        """
+        Contains the filter output voltage (V) (`read only`).
+
+        """
+        return self._v[-1]
+
+    def update(self, t):
+        """
+        Update the filter output voltages to time `t` (s).
+
+        """
+        dt = t - self._t
+        if dt <= 0:
+            return
+        self._t = t
+        decay = np.exp(-dt/self._tau)
+        vin = self._vref * float(self._pin.state)
+        for i in range(len(self._v)):
+            self._v[i] = vin + (self._v[i]-vin)*decay
+            vin = self._v[i]
+
+
+class ScriptedButton:
+    """
+    The class to represent a simulated push button that is pressed at given
+    times (e.g. the button of a ``Dimmer``).
+
+    :param factory: The simulation pin factory.
+    :type factory: SimFactory
+
+    :param pin: The GPIO pin of the button.
+    :type pin: int or str
+
+    :param presses: The list of press and release times (s), e.g.
+        ``[(1, 2.5), (4, 4.1)]``.
+    :type presses: list(tuple)
+
+    :param pull_up: ``True`` if the button connects the pin to ground (as in
+        ``Dimmer``). Default value is ``True``.
+    :type pull_up: bool
+
+    """
+    def __init__(self, factory, pin, presses, pull_up=True):
+        """
+        Class constructor.
+
+        """
+        self._pin = factory.pin(pin)
+        self._presses = list(presses)
+        self._pull_up = pull_up
+        self.pressed = False
+        factory.add_model(self)
+
+    def update(self, t):
+        """
+        Update the button pin state to time `t` (s).
+
+        """
+        pressed = any(tdown <= t < tup for tdown, tup in self._presses)
+        if pressed != self.pressed:
+            self.pressed = pressed
+            if pressed == self._pull_up:
+                self._pin.drive_low()
+            else:
+                self._pin.drive_high()
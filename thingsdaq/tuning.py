@@ -0,0 +1,699 @@
+"""
+tuning.py contains classes and functions that are used to tune the PID
+controllers of gpiozero_extended.py.
+
+A relay feedback experiment estimates the ultimate gain and period of a
+motor control loop, which are used by classic tuning rules. A discrete-time
+simulation couples the `PID` difference equation (evaluated for many gain
+sets at once with `PIDBank`) with a DC motor model, whose parameters can be
+obtained from the motor characterization tests (maximum speed and time
+constant). Step response metrics are calculated for each gain set, so grids
+of thousands of gain sets can be compared offline.
+
+Author: Eduardo Nigro
+    rev 0.0.1
+    2026-10-17
+"""
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from gpiozero_extended import PIDBank
+from scheduler import Ticker
+
+# PID tuning rules based on the ultimate gain (Ku) and period (Pu):
+# (Kc/Ku, Ti/Pu, Td/Pu), where kp = Kc, ki = Kc/Ti, and kd = Kc*Td
+TUNING_RULES = {
+    'ziegler-nichols': (0.6, 1/2, 1/8),
+    'ziegler-nichols-pi': (0.45, 1/1.2, 0),
+    'tyreus-luyben': (1/2.2, 2.2, 1/6.3),
+    'pessen': (0.7, 0.4, 0.15),
+    'some-overshoot': (0.33, 1/2, 1/3),
+    'no-overshoot': (0.2, 1/2, 1/3)}
+
+
+class MotorModel:
+    """
+    The class to represent a DC motor model for closed-loop simulations.
+
+    The motor speed responds to the controller output (duty cycle) as a
+    first-order system with the mechanical time constant `taum`, or as a
+    second-order system if the electrical time constant `taue` is also
+    used. The model output is the motor speed (rad/s) or, if `position` is
+    ``True``, the motor angle (deg). The states are arrays, so N motors are
+    simulated together.
+
+    Create a motor model for position control:
+
+        >>> from tuning import MotorModel
+        >>> motor = MotorModel(wmax=30, taum=0.05, position=True)
+
+    :param wmax: The steady state speed at full output (rad/s).
+        Default value is ``30``.
+    :type wmax: float
+
+    :param taum: The mechanical time constant (s). Default value is ``0.05``.
+    :type taum: float
+
+    :param taue: The electrical time constant (s). Default value is ``0``
+        (first-order model).
+    :type taue: float
+
+    :param position: Uses the motor angle as the output if ``True``, or the
+        motor speed if ``False``. Default value is ``False``.
+    :type position: bool
+
+    :param substeps: The number of integration steps per update.
+        Default value is ``10``.
+    :type substeps: int
+
+    """
+    def __init__(
+        self, wmax=30, taum=0.05, taue=0, position=False, substeps=10):
+        """
+        Class constructor.
+
+        """
+        self.wmax = wmax
+        self.taum = taum
+        self.taue = taue
+        self.position = position
+        self._substeps = substeps
+        self.reset(1)
+
+    def reset(self, n):
+        """
+        Reset the states of `n` motors.
+
+        :param n: The number of simulated motors.
+        :type n: int
+
+        """
+        self._i = np.zeros(n)  # Normalized current (electrical lag output)
+        self._w = np.zeros(n)  # Speed (rad/s)
+        self._theta = np.zeros(n)  # Angle (rad)
+
+    @property
+    def output(self):
+        """
+        Contains the model outputs: speeds (rad/s) or angles (deg)
+        (`read only`).
+
+        """
+        if self.position:
+            return np.degrees(self._theta)
+        return self._w.copy()
+
+    def update(self, u, dt):
+        """
+        Advance the model states by `dt` seconds with constant inputs `u`
+        and return the outputs.
+
+        :param u: The controller outputs (duty cycles).
+        :type u: float or ndarray
+
+        :param dt: The time step (s).
+        :type dt: float
+
+        """
+        h = dt/self._substeps
+        decaym = np.exp(-h/self.taum)
+        decaye = np.exp(-h/self.taue) if self.taue > 0 else 0
+        for _ in range(self._substeps):
+            # Cascaded first-order lags, integrated exactly for each substep
+            self._i = u + (self._i-u)*decaye
+            wss = self.wmax*self._i
+            self._theta += wss*h + (self._w-wss)*self.taum*(1-decaym)
+            self._w = wss + (self._w-wss)*decaym
+        return self.output
+
+
+def simulate_pid(
+    Ts, kp, ki, kd, tau=0, umax=1, umin=-1, xsp=1, tstop=2, model=None):
+    """
+    Simulate the closed-loop step response of a motor with PID control,
+    for one or many gain sets at once.
+
+    At each time step, the motor output is measured, the controller output
+    is calculated, and the motor model is advanced by `Ts` seconds, as in
+    the execution loops of the coding examples.
+
+    :param Ts: The sampling period of the execution loop (s).
+    :type Ts: float
+
+    :param kp: The PID proportional gains.
+    :type kp: float or array_like
+
+    :param ki: The PID integral gains.
+    :type ki: float or array_like
+
+    :param kd: The PID derivative gains.
+    :type kd: float or array_like
+
+    :param tau: The derivative term low-pass filter response times (s).
+        Default value is ``0``.
+    :type tau: float or array_like
+
+    :param umax: The upper bound of the controller output saturation.
+        Default value is ``1``.
+    :type umax: float
+
+    :param umin: The lower bound of the controller output saturation.
+        Default value is ``-1``.
+    :type umin: float
+
+    :param xsp: The step set point. Default value is ``1``.
+    :type xsp: float
+
+    :param tstop: The simulation time (s). Default value is ``2``.
+    :type tstop: float
+
+    :param model: The motor model. Default value is ``MotorModel()``.
+    :type model: MotorModel
+
+    :returns: The time array and the output and controller output arrays
+        (one column per gain set).
+    :rtype: tuple(ndarray)
+
+    Example
+    -------
+        >>> t, x, u = simulate_pid(0.01, 0.15, 0.35, 0.01, umin=0, xsp=20)
+        >>> plot_line([t, t], [x[:, 0], u[:, 0]], axes='multi')
+
+    """
+    if model is None:
+        model = MotorModel()
+    pids = PIDBank(Ts, kp, ki, kd, umax, umin, tau)
+    n = len(pids)
+    nsteps = int(np.floor(tstop/Ts)) + 1
+    t = Ts*np.arange(nsteps)
+    x = np.zeros((nsteps, n))
+    u = np.zeros((nsteps, n))
+    model.reset(n)
+    xcurr = model.output
+    for k in range(nsteps):
+        x[k] = xcurr
+        u[k] = pids.control(xsp, xcurr)
+        xcurr = model.update(u[k], Ts)
+    return t, x, u
+
+
+def step_metrics(t, x, xsp, x0=0, band=0.02):
+    """
+    Calculate step response metrics, for one or many responses.
+
+        * ``risetime``: time from 10% to 90% of the step (s)
+        * ``overshoot``: maximum overshoot (% of the step)
+        * ``settlingtime``: time after which the response stays within
+          `band` of the set point (s)
+        * ``iae``: integral of the absolute error
+
+    Metrics that can't be calculated (e.g. the response doesn't reach 90%
+    or doesn't settle) are ``nan``.
+
+    :param t: The time array (s).
+    :type t: ndarray
+
+    :param x: The response array (one column per response).
+    :type x: ndarray
+
+    :param xsp: The step set point.
+    :type xsp: float
+
+    :param x0: The initial value. Default value is ``0``.
+    :type x0: float
+
+    :param band: The settling band (fraction of the step).
+        Default value is ``0.02``.
+    :type band: float
+
+    :returns: A dictionary with the metric arrays.
+    :rtype: dict
+
+    Example
+    -------
+        >>> metrics = step_metrics(t, x, 20)
+        >>> metrics['overshoot']
+
+    """
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 1:
+        x = x[:, np.newaxis]
+    y = (x - x0)/(xsp - x0)  # Normalized response
+    # Rise time
+    above10 = y >= 0.1
+    above90 = y >= 0.9
+    i10 = np.argmax(above10, axis=0)
+    i90 = np.argmax(above90, axis=0)
+    risetime = np.where(above90.any(axis=0), t[i90] - t[i10], np.nan)
+    # Overshoot
+    overshoot = 100*np.maximum(y.max(axis=0) - 1, 0)
+    # Settling time (time after the last sample outside the band)
+    outside = np.abs(y - 1) > band
+    ilast = len(t) - 1 - np.argmax(outside[::-1], axis=0)
+    settlingtime = np.where(
+        outside[-1], np.nan, t[np.minimum(ilast+1, len(t)-1)])
+    settlingtime[~outside.any(axis=0)] = t[0]
+    # Integral of absolute error (rectangle rule)
+    dt = np.diff(t, append=t[-1])
+    iae = np.abs(xsp - x).T @ dt
+    return {
+        'risetime': risetime,
+        'overshoot': overshoot,
+        'settlingtime': settlingtime,
+        'iae': iae}
+
+
+def _sweep_chunk(Ts, kp, ki, kd, tau, options):
+    # Simulates a chunk of gain sets and returns their metrics
+    options = dict(options)
+    band = options.pop('band')
+    t, x, _ = simulate_pid(Ts, kp, ki, kd, tau, **options)
+    return step_metrics(t, x, options['xsp'], band=band)
+
+
+def sweep_pid(
+    Ts, kp, ki, kd, tau=0, grid=True, processes=None, chunksize=1000,
+    band=0.02, **options):
+    """
+    Evaluate the closed-loop step response metrics of many PID gain sets.
+
+    The gain sets are simulated together (vectorized), in chunks of
+    `chunksize` gain sets. The chunks can be run in parallel in a process
+    pool.
+
+    :param Ts: The sampling period of the execution loop (s).
+    :type Ts: float
+
+    :param kp: The PID proportional gains.
+    :type kp: float or array_like
+
+    :param ki: The PID integral gains.
+    :type ki: float or array_like
+
+    :param kd: The PID derivative gains.
+    :type kd: float or array_like
+
+    :param tau: The derivative term low-pass filter response times (s).
+        Default value is ``0``.
+    :type tau: float or array_like
+
+    :param grid: Evaluates all combinations of the gain values if ``True``,
+        or the gain sets given element-wise if ``False``.
+        Default value is ``True``.
+    :type grid: bool
+
+    :param processes: The number of worker processes. If ``None``, the
+        chunks are run in the current process. Default value is ``None``.
+    :type processes: int
+
+    :param chunksize: The number of gain sets simulated together.
+        Default value is ``1000``.
+    :type chunksize: int
+
+    :param band: The settling band (fraction of the step).
+        Default value is ``0.02``.
+    :type band: float
+
+    :param options: The `simulate_pid` keyword arguments (``umax``,
+        ``umin``, ``xsp``, ``tstop``, ``model``).
+
+    :returns: A dictionary with the gain arrays (``kp``, ``ki``, ``kd``,
+        ``tau``) and the metric arrays (see `step_metrics`).
+    :rtype: dict
+
+    Example
+    -------
+        >>> results = sweep_pid(
+                0.01, np.linspace(0.05, 0.5, 20), np.linspace(0, 2, 20),
+                np.linspace(0, 0.02, 10), tau=0.01, umin=0, xsp=20,
+                processes=4)
+        >>> best = np.nanargmin(results['iae'])
+        >>> results['kp'][best], results['ki'][best], results['kd'][best]
+
+    """
+    if grid:
+        gains = np.meshgrid(kp, ki, kd, tau, indexing='ij')
+    else:
+        gains = np.broadcast_arrays(kp, ki, kd, tau)
+    kp, ki, kd, tau = [np.ravel(gain).astype(float) for gain in gains]
+    options.setdefault('xsp', 1)
+    options['band'] = band
+    chunks = [
+        (Ts, kp[i:i+chunksize], ki[i:i+chunksize], kd[i:i+chunksize],
+         tau[i:i+chunksize], options)
+        for i in range(0, len(kp), chunksize)]
+    if processes is None:
+        metrics = [_sweep_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            metrics = list(executor.map(_sweep_chunk, *zip(*chunks)))
+    results = {'kp': kp, 'ki': ki, 'kd': kd, 'tau': tau}
+    for name in metrics[0]:
+        results[name] = np.concatenate([metric[name] for metric in metrics])
+    return results
+
+
+def pid_rules(ku, pu, rules=None):
+    """
+    Calculate PID gains from the ultimate gain and period using tuning
+    rules (see `TUNING_RULES`).
+
+    :param ku: The ultimate gain.
+    :type ku: float
+
+    :param pu: The ultimate period (s).
+    :type pu: float
+
+    :param rules: The list of rule names. Default value is all rules.
+    :type rules: list(str)
+
+    :returns: A dictionary with the gains ``(kp, ki, kd)`` of each rule.
+    :rtype: dict
+
+    Example
+    -------
+        >>> pid_rules(0.05, 0.12)['tyreus-luyben']
+
+    """
+    if rules is None:
+        rules = list(TUNING_RULES)
+    gains = {}
+    for rule in rules:
+        if rule not in TUNING_RULES:
+            raise Exception('Valid rules are: {:s}.'.format(
+                ', '.join(TUNING_RULES)))
+        ckc, cti, ctd = TUNING_RULES[rule]
+        kc = ckc*ku
+        gains[rule] = (kc, kc/(cti*pu), kc*ctd*pu)
+    return gains
+
+
+class RelayAutotune:
+    """
+    The class to represent a relay feedback (bang-bang) tuning experiment.
+
+    The controller output switches between ``bias+d`` and ``bias-d`` when
+    the error changes sign (beyond the hysteresis band), which makes the
+    loop oscillate at its ultimate period. The period and amplitude of each
+    oscillation cycle are measured online, and the ultimate gain is
+    estimated from the describing function of the relay:
+
+        ``Ku = 4*d/(pi*sqrt(a**2 - h**2))``
+
+    where ``a`` is the oscillation amplitude and ``h`` is the hysteresis.
+    The first cycle is discarded and the estimates are the mean values of
+    the last `ncycles` cycles.
+
+    Use the relay in an execution loop:
+
+        >>> from tuning import RelayAutotune
+        >>> relay = RelayAutotune(xsp=90, d=0.3)
+        >>> for tcurr in ticker:
+                mymotor.set_output(relay.update(tcurr, mymotor.get_angle()))
+                if relay.done:
+                    break
+        >>> mymotor.set_output(0)
+        >>> relay.report()
+        >>> kp, ki, kd = relay.gains('tyreus-luyben')
+
+    :param xsp: The set point around which the loop oscillates.
+    :type xsp: float
+
+    :param d: The relay amplitude (controller output). Default value is
+        ``0.5``.
+    :type d: float
+
+    :param bias: The relay center value (controller output), e.g. the
+        output that holds a speed set point. Default value is ``0``.
+    :type bias: float
+
+    :param hysteresis: The error band where the relay doesn't switch.
+        Default value is ``0``.
+    :type hysteresis: float
+
+    :param ncycles: The number of oscillation cycles used in the estimates.
+        Default value is ``3``.
+    :type ncycles: int
+
+    """
+    def __init__(self, xsp, d=0.5, bias=0, hysteresis=0, ncycles=3):
+        """
+        Class constructor.
+
+        """
+        self._xsp = xsp
+        self._d = d
+        self._bias = bias
+        self._hysteresis = hysteresis
+        self._ncycles = ncycles
+        self.reset()
+
+    def reset(self):
+        """
+        Restart the experiment.
+
+        >>> relay.reset()
+
+        """
+        self._high = None  # Relay state
+        self._tswitch = None  # Time of the last upward switch (s)
+        self._xmax = -np.inf  # Maximum value in the current cycle
+        self._xmin = np.inf  # Minimum value in the current cycle
+        self._periods = []  # Periods of the completed cycles (s)
+        self._amplitudes = []  # Amplitudes of the completed cycles
+
+    def update(self, t, x):
+        """
+        Update the relay with a measured value and return the controller
+        output.
+
+        :param t: The current time (s).
+        :type t: float
+
+        :param x: The measured value at the time step.
+        :type x: float
+
+        """
+        e = self._xsp - x
+        if e > self._hysteresis:
+            high = True
+        elif e < -self._hysteresis:
+            high = False
+        else:
+            high = self._high if self._high is not None else e >= 0
+        # Measuring cycle at each upward switch
+        if high and (self._high is False):
+            if self._tswitch is not None:
+                self._periods.append(t - self._tswitch)
+                self._amplitudes.append((self._xmax - self._xmin)/2)
+            self._tswitch = t
+            self._xmax = -np.inf
+            self._xmin = np.inf
+        self._high = high
+        if x > self._xmax:
+            self._xmax = x
+        if x < self._xmin:
+            self._xmin = x
+        return self._bias + self._d if high else self._bias - self._d
+
+    @property
+    def ncycles(self):
+        """
+        Contains the number of completed oscillation cycles (`read only`).
+
+        """
+        return len(self._periods)
+
+    @property
+    def done(self):
+        """
+        Contains ``True`` if enough cycles were completed for the estimates
+        (`read only`).
+
+        """
+        return len(self._periods) > self._ncycles
+
+    @property
+    def amplitude(self):
+        """
+        Contains the estimated oscillation amplitude (`read only`).
+
+        """
+        if len(self._amplitudes) < 2:
+            return np.nan
+        return np.mean(self._amplitudes[1:][-self._ncycles:])
+
+    @property
+    def pu(self):
+        """
+        Contains the estimated ultimate period (s) (`read only`).
+
+        """
+        if len(self._periods) < 2:
+            return np.nan
+        return np.mean(self._periods[1:][-self._ncycles:])
+
+    @property
+    def ku(self):
+        """
+        Contains the estimated ultimate gain (`read only`).
+
+        """
+        a = self.amplitude
+        if not a > self._hysteresis:
+            return np.nan
+        return 4*self._d/(np.pi*np.sqrt(a**2 - self._hysteresis**2))
+
+    def gains(self, rule='ziegler-nichols'):
+        """
+        Return the PID gains ``(kp, ki, kd)`` from a tuning rule.
+
+        :param rule: The rule name (see `TUNING_RULES`).
+            Default value is ``'ziegler-nichols'``.
+        :type rule: str
+
+        >>> kp, ki, kd = relay.gains('tyreus-luyben')
+
+        """
+        return pid_rules(self.ku, self.pu, [rule])[rule]
+
+    def report(self):
+        """
+        Print the estimates and the gains of all tuning rules.
+
+        >>> relay.report()
+
+        """
+        print('Cycles = {:d} , Ku = {:0.4g} , Pu (s) = {:0.4g}'.format(
+            self.ncycles, self.ku, self.pu))
+        for rule, (kp, ki, kd) in pid_rules(self.ku, self.pu).items():
+            print('{:s}: kp = {:0.4g} , ki = {:0.4g} , kd = {:0.4g}'.format(
+                rule, kp, ki, kd))
+
+
+def autotune(
+    motor, Ts, xsp=None, d=0.5, bias=0, hysteresis=0, ncycles=3, tstop=20,
+    measure=None):
+    """
+    Run a relay feedback experiment with a ``Motor`` object (or any object
+    with a ``set_output`` method) and return the relay with the estimates.
+
+    :param motor: The motor object.
+    :type motor: Motor
+
+    :param Ts: The sampling period of the execution loop (s).
+    :type Ts: float
+
+    :param xsp: The set point around which the loop oscillates. Default
+        value is the measured value at the start.
+    :type xsp: float
+
+    :param d: The relay amplitude (controller output). Default value is
+        ``0.5``.
+    :type d: float
+
+    :param bias: The relay center value (controller output).
+        Default value is ``0``.
+    :type bias: float
+
+    :param hysteresis: The error band where the relay doesn't switch.
+        Default value is ``0``.
+    :type hysteresis: float
+
+    :param ncycles: The number of oscillation cycles used in the estimates.
+        Default value is ``3``.
+    :type ncycles: int
+
+    :param tstop: The maximum experiment duration (s). Default value is
+        ``20``.
+    :type tstop: float
+
+    :param measure: The function that returns the measured value.
+        Default value is ``motor.get_angle``.
+    :type measure: callable
+
+    :returns: The relay object (see `RelayAutotune`).
+    :rtype: RelayAutotune
+
+    Example
+    -------
+        >>> relay = autotune(mymotor, 0.01, d=0.3)
+        >>> relay.report()
+
+    """
+    if measure is None:
+        measure = motor.get_angle
+    if xsp is None:
+        xsp = measure()
+    relay = RelayAutotune(xsp, d, bias, hysteresis, ncycles)
+    try:
+        for tcurr in Ticker(Ts, tstop):
+            motor.set_output(relay.update(tcurr, measure()))
+            if relay.done:
+                break
+    finally:
+        motor.set_output(0)
+    return relay
+
+
+def refine_pid(
+    Ts, kp, ki, kd, model, scale=np.linspace(0.5, 1.5, 11),
+    maxovershoot=np.inf, key='iae', **options):
+    """
+    Refine PID gains (e.g. from a tuning rule) with the offline simulation,
+    by scaling each gain and selecting the gain set with the smallest
+    metric value.
+
+    :param Ts: The sampling period of the execution loop (s).
+    :type Ts: float
+
+    :param kp: The initial proportional gain.
+    :type kp: float
+
+    :param ki: The initial integral gain.
+    :type ki: float
+
+    :param kd: The initial derivative gain.
+    :type kd: float
+
+    :param model: The motor model.
+    :type model: MotorModel
+
+    :param scale: The scale factors applied to each gain.
+        Default value is ``np.linspace(0.5, 1.5, 11)``.
+    :type scale: ndarray
+
+    :param maxovershoot: The maximum allowed overshoot (%).
+        Default value is ``inf``.
+    :type maxovershoot: float
+
+    :param key: The metric that is minimized (see `step_metrics`).
+        Default value is ``'iae'``.
+    :type key: str
+
+    :param options: The `sweep_pid` keyword arguments.
+
+    :returns: The refined gains ``(kp, ki, kd)`` and a dictionary with their
+        metrics.
+    :rtype: tuple
+
+    Example
+    -------
+        >>> model = MotorModel(wmax=30, taum=0.05, position=True)
+        >>> (kp, ki, kd), metrics = refine_pid(
+                0.01, *relay.gains('tyreus-luyben'), model, xsp=90,
+                maxovershoot=5)
+
+    """
+    scale = np.asarray(scale)
+    results = sweep_pid(
+        Ts, kp*scale, ki*scale, kd*scale, model=model, **options)
+    values = np.where(
+        results['overshoot'] <= maxovershoot, results[key], np.nan)
+    if np.all(np.isnan(values)):
+        raise Exception('No gain set satisfies the overshoot limit.')
+    best = np.nanargmin(values)
+    gains = (results['kp'][best], results['ki'][best], results['kd'][best])
+    metrics = {
+        name: results[name][best]
+        for name in ('risetime', 'overshoot', 'settlingtime', 'iae')}
+    return gains, metrics
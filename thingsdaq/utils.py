@@ -4,9 +4,11 @@ Contains a useful plotting function that is used in the coding examples.
 The function was built using Plotly instead of Matplotlib due to its
 interactive graphs and because it runs better on Raspberry Pi Linux.
 
+Also contains event detection functions used in signal processing.
+
 Author: Eduardo Nigro
-    rev 0.0.6
-    2022-01-24
+    rev 0.0.8
+    2026-10-17
 """
 import numpy as np
 import plotly.io as pio
@@ -191,10 +193,14 @@ def plot_line(
         margin=margin, width=wfig, height=hfig, showlegend=showlegend)
     fig.show()
 
-def find_cluster(x, xval):
+def find_cluster(x, xval, asarray=False):
     """
     Find clusters of data in an ndarray that satisfy a certain condition.
 
+    The clusters are found with a vectorized edge detection: the padded
+    difference of the condition mask is ``1`` where a cluster starts and
+    ``-1`` right after it ends.
+
 
     :param x: The array containing the data for the cluster search.
     :type x: ndarray
@@ -202,6 +208,10 @@ def find_cluster(x, xval):
     :param xval: The value of x that has to be satisfied for clustering.
     :type xval: integer, float
 
+    :param asarray: Returns ndarrays instead of lists if ``True``.
+        Default value is ``False``.
+    :type asarray: bool
+
 
     :returns: 2-tuple
 
@@ -222,40 +232,503 @@ def find_cluster(x, xval):
         >>> i0, clustersize = find_cluster(x, 1)
 
     """
-    # Cluster information list
-    a = []
-    # Initial (place holder) values for cluster start and end points
-    kstart = -1
-    kend = -1
-    # Going through each value of x
-    for i, xi in enumerate(x):
-        if xi == xval:
-            # Assigning cluster starting point
-            if kstart == -1:
-                kstart = i
-            # Assigning cluster end point for particular case
-            # when there is an xval in the last position of x
-            if i == len(x)-1:
-                kend = i
-        else:
-            # Assigning cluster end point
-            if kstart != -1 and kend == -1:
-                kend = i-1
-        # Updating cluster information list
-        # and resetting kstart and kend
-        if kstart != -1 and kend != -1:
-            a.append(kstart)
-            a.append(kend)
-            kstart = -1
-            kend = -1
-    # Assigning indeces of cluster starting points
-    # (Every other point starting from position 0)
-    i0 = a[0:-1:2]
-    # Assigning cluster sizes
-    # (Every other point starting from position 1)
-    clustersize = list(np.array(a[1::2]) - np.array(i0) + 1)
-    # Case where cluster size is ZERO
+    # Padding condition mask with False so clusters at both ends have edges
+    mask = np.zeros(len(x)+2, dtype=np.int8)
+    mask[1:-1] = np.asarray(x) == xval
+    # Finding cluster start (+1) and end (-1) edges
+    edges = np.diff(mask)
+    i0 = np.flatnonzero(edges == 1)
+    clustersize = np.flatnonzero(edges == -1) - i0
+    if asarray:
+        return i0, clustersize
+    return i0.tolist(), clustersize.tolist()
+
+
+class ClusterDetector:
+    """
+    The class to represent a streaming version of `find_cluster`.
+
+    Data is processed in successive chunks (e.g. the new samples of each
+    display period) instead of rescanning the whole buffer. A cluster that
+    reaches the end of a chunk is kept open and merged with the next chunk, so
+    it's only reported once it is complete. Cluster indices are absolute, i.e.
+    counted from the first sample of the first chunk.
+
+    Create a detector and process chunks as they arrive:
+
+        >>> detector = ClusterDetector(1)
+        >>> icl, ncl, tcl = detector.update(dvdt>0.25, t)
+
+    :param xval: The value of x that has to be satisfied for clustering.
+    :type xval: integer, float
+
+    """
+    def __init__(self, xval):
+        """
+        Class constructor.
+
+        """
+        self._xval = xval
+        self.reset()
+
+    @property
+    def nprocessed(self):
+        """
+        Contains the total number of samples processed (`read only`).
+
+        """
+        return self._nprocessed
+
+    def reset(self):
+        """
+        Reset the detector, discarding any open cluster.
+
+        >>> detector.reset()
+
+        """
+        self._nprocessed = 0  # Absolute index of the next sample
+        self._kstart = -1  # Absolute start index of the open cluster
+        self._tstart = None  # Start time of the open cluster
+
+    def update(self, x, t=None):
+        """
+        Process a new chunk of data and return the completed clusters.
+
+        :param x: The chunk containing the data for the cluster search.
+        :type x: ndarray
+
+        :param t: The chunk sample times (optional).
+        :type t: ndarray
+
+
+        :returns: 3-tuple
+
+            * i0:
+
+                The absolute index of each completed cluster starting point.
+
+            * clustersize:
+
+                The corresponding lengths of each cluster.
+
+            * t0:
+
+                The time of each cluster starting point
+                (``None`` if `t` is not used).
+
+        :rtype: (ndarray, ndarray, ndarray)
+
+        >>> icl, ncl, tcl = detector.update(dvdt>0.25, t)
+
+        """
+        x = np.asarray(x)
+        n = len(x)
+        k0 = self._nprocessed
+        i0, clustersize = find_cluster(x, self._xval, asarray=True)
+        t0 = None if t is None else np.asarray(t, dtype=float)[i0]
+        i0 = i0 + k0
+        if n == 0:
+            return i0, clustersize, t0
+        # Completing open cluster from previous chunk
+        if self._kstart >= 0:
+            if len(i0) and (i0[0] == k0):
+                clustersize[0] += k0 - self._kstart
+                i0[0] = self._kstart
+                if t0 is not None:
+                    t0[0] = self._tstart
+            else:
+                i0 = np.insert(i0, 0, self._kstart)
+                clustersize = np.insert(clustersize, 0, k0 - self._kstart)
+                if t0 is not None:
+                    t0 = np.insert(t0, 0, self._tstart)
+            self._kstart = -1
+            self._tstart = None
+        # Holding cluster that reaches the end of the chunk
+        if len(i0) and (i0[-1] + clustersize[-1] == k0 + n):
+            self._kstart = i0[-1]
+            i0 = i0[:-1]
+            clustersize = clustersize[:-1]
+            if t0 is not None:
+                self._tstart = t0[-1]
+                t0 = t0[:-1]
+        self._nprocessed = k0 + n
+        return i0, clustersize, t0
+
+    def flush(self):
+        """
+        Complete the open cluster (if any) at the end of the data stream
+        and return it.
+
+        :returns: 3-tuple (i0, clustersize, t0) as in `update`.
+        :rtype: (ndarray, ndarray, ndarray)
+
+        >>> icl, ncl, tcl = detector.flush()
+
+        """
+        i0 = np.zeros(0, dtype=np.int64)
+        clustersize = np.zeros(0, dtype=np.int64)
+        t0 = None
+        if self._kstart >= 0:
+            i0 = np.array([self._kstart])
+            clustersize = np.array([self._nprocessed - self._kstart])
+            if self._tstart is not None:
+                t0 = np.array([self._tstart])
+            self._kstart = -1
+            self._tstart = None
+        return i0, clustersize, t0
+
+
+def interp_crossing(x, t, i0, level, method='linear'):
+    """
+    Find the threshold crossing times of trigger events with sub-sample
+    resolution.
+
+    The event starting point ``i0`` is the first sample beyond the trigger
+    level, so the actual crossing happens between samples ``i0-1`` and
+    ``i0``. Its time is found by interpolating the signal around that
+    interval, for all events at once.
+
+    :param x: The signal values.
+    :type x: ndarray
+
+    :param t: The sample times.
+    :type t: ndarray
+
+    :param i0: The index of each event starting point.
+    :type i0: list(int), ndarray
+
+    :param level: The trigger level.
+    :type level: float
+
+    :param method: The interpolation method: ``'linear'`` (samples ``i0-1``
+        and ``i0``) or ``'parabolic'`` (samples ``i0-2``, ``i0-1``, and
+        ``i0``). Default value is ``'linear'``.
+    :type method: str
+
+    :returns: The crossing time of each event. Events starting at the first
+        sample keep the time of the starting point.
+    :rtype: ndarray
+
+
+    Example
+    -------
+        >>> icl, ncl = find_cluster(dvdt>0.25, 1)
+        >>> ttrigger = interp_crossing(dvdt, t, icl, 0.25)
+
+    """
+    if method not in ['linear', 'parabolic']:
+        raise Exception("Valid method options are: 'linear' or 'parabolic'.")
+    x = np.asarray(x, dtype=float)
+    t = np.asarray(t, dtype=float)
+    i0 = np.asarray(i0, dtype=np.int64)
+    tcross = t[i0]
+    # Using only events with a previous sample
+    k = np.flatnonzero(i0 >= 1)
+    i = i0[k]
+    x0 = x[i]
+    x1 = x[i-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Linear interpolation (crossing position u between -1 and 0)
+        u = np.where(x0 != x1, (level-x1)/(x0-x1), 1.0) - 1
+        u = np.clip(u, -1, 0)
+        if method == 'parabolic':
+            # Quadratic a*u^2 + b*u + c through u = -2, -1, 0
+            kp = np.flatnonzero(i >= 2)
+            x2 = x[i[kp]-2]
+            a = (x0[kp] - 2*x1[kp] + x2)/2
+            b = (3*x0[kp] - 4*x1[kp] + x2)/2
+            c = x0[kp] - level
+            sqrtdisc = np.sqrt(b**2 - 4*a*c)
+            r1 = (-b + sqrtdisc)/(2*a)
+            r2 = (-b - sqrtdisc)/(2*a)
+            # Keeping the root inside the crossing interval
+            # (linear result is kept otherwise)
+            ok1 = (r1 >= -1) & (r1 <= 0)
+            ok2 = (r2 >= -1) & (r2 <= 0)
+            up = np.where(ok1, r1, np.where(ok2, r2, u[kp]))
+            u[kp] = np.where(a != 0, up, u[kp])
+    tcross[k] = t[i] + u*(t[i]-t[i-1])
+    return tcross
+
+
+def _cluster_peaks(y, i0, clustersize):
+    # Returns the index and value of the maximum of `y` in each cluster,
+    # computed for all clusters at once with `np.maximum.reduceat`
     if len(i0) == 0:
-        i0 = []
-        clustersize = []
-    return i0, clustersize
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    offsets = np.cumsum(clustersize) - clustersize
+    # Indices of all cluster samples, concatenated
+    idx = np.repeat(i0-offsets, clustersize) + np.arange(np.sum(clustersize))
+    values = y[idx]
+    ypeak = np.maximum.reduceat(values, offsets)
+    # First sample of each cluster that matches the cluster maximum
+    ihit = np.flatnonzero(values == np.repeat(ypeak, clustersize))
+    labels = np.repeat(np.arange(len(i0)), clustersize)[ihit]
+    ipeak = idx[ihit[np.unique(labels, return_index=True)[1]]]
+    return ipeak, ypeak
+
+
+class Trigger:
+    """
+    The class to represent a trigger engine for event detection.
+
+    A trigger event is a cluster of samples where the signal is beyond the
+    trigger level. The engine supports:
+
+        * rising edge (signal above `level`), falling edge (signal below
+          `level`), or both
+        * hysteresis, where a rising (falling) event only ends when the
+          signal goes below (above) `level` minus (plus) `hysteresis`
+        * minimum event length, to reject spurious events
+        * hold-off, to ignore events too close to the previous one
+          (of the same edge)
+        * signal peak (maximum for rising, minimum for falling edges) of
+          every event, computed in a single vectorized pass
+
+    The data can be processed as a full array or in successive chunks. An
+    event that reaches the end of a chunk is only reported once it is
+    complete.
+
+    The events are returned as a structured ndarray with the fields:
+
+        * ``i0``: index of the event starting point
+        * ``clustersize``: number of samples of the event
+        * ``ipeak``: index of the signal peak
+        * ``xpeak``: signal peak value
+        * ``edge``: ``1`` for rising and ``-1`` for falling edge events
+        * ``t0``: time of the event starting point (``nan`` without time)
+        * ``tpeak``: time of the signal peak (``nan`` without time)
+        * ``ttrigger``: time of the level crossing, interpolated with the
+          `interp` method (``t0`` without interpolation, ``nan`` without time)
+
+    Indices are absolute, i.e. counted from the first sample of the first
+    chunk.
+
+    Create a rising edge trigger and process chunks as they arrive:
+
+        >>> trigger = Trigger(0.25, hysteresis=0.05, minsize=2, holdoff=0.3)
+        >>> events = trigger.update(dvdt, t)
+        >>> ttrigger = events['ttrigger']
+
+    :param level: The trigger level.
+    :type level: float
+
+    :param edge: The trigger edge: ``'rising'``, ``'falling'``, or ``'both'``.
+        Default value is ``'rising'``.
+    :type edge: str
+
+    :param hysteresis: The hysteresis band width. Default value is ``0``.
+    :type hysteresis: float
+
+    :param minsize: The minimum number of samples of an event.
+        Default value is ``1``.
+    :type minsize: int
+
+    :param holdoff: The minimum interval between event starting points.
+        In seconds if the sample times are used, otherwise in samples.
+        Default value is ``0``.
+    :type holdoff: float
+
+    :param interp: The crossing time interpolation method (see
+        `interp_crossing`): ``'linear'``, ``'parabolic'`` or ``None``.
+        Default value is ``None``.
+    :type interp: str
+
+    """
+    # Data type of the trigger events array
+    dtype = np.dtype([
+        ('i0', np.int64), ('clustersize', np.int64),
+        ('ipeak', np.int64), ('xpeak', np.float64), ('edge', np.int8),
+        ('t0', np.float64), ('tpeak', np.float64), ('ttrigger', np.float64)])
+
+    def __init__(
+        self, level, edge='rising', hysteresis=0, minsize=1, holdoff=0,
+        interp=None):
+        """
+        Class constructor.
+
+        """
+        if edge == 'rising':
+            self._edges = [1]
+        elif edge == 'falling':
+            self._edges = [-1]
+        elif edge == 'both':
+            self._edges = [1, -1]
+        else:
+            raise Exception(
+                "Valid edge options are: 'rising', 'falling', or 'both'.")
+        if hysteresis < 0:
+            raise Exception('"hysteresis" must not be negative.')
+        if interp not in [None, 'linear', 'parabolic']:
+            raise Exception(
+                "Valid interp options are: 'linear', 'parabolic', or None.")
+        self._level = level
+        self._hysteresis = hysteresis
+        self._minsize = minsize
+        self._holdoff = holdoff
+        self._interp = interp
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the trigger, discarding any open event.
+
+        >>> trigger.reset()
+
+        """
+        self._nprocessed = 0  # Absolute index of the next sample
+        self._state = {s: 0 for s in self._edges}  # Trigger state per edge
+        self._open = {s: None for s in self._edges}  # Open event per edge
+        self._last = {s: -np.inf for s in self._edges}  # Last event start
+        self._xprev = np.zeros(0)  # Last samples of the previous chunk
+        self._tprev = np.zeros(0)  # Last sample times of the previous chunk
+
+    def update(self, x, t=None):
+        """
+        Process a new chunk of data and return the completed events.
+
+        :param x: The chunk containing the signal values.
+        :type x: ndarray
+
+        :param t: The chunk sample times (optional).
+        :type t: ndarray
+
+        :returns: The trigger events.
+        :rtype: structured ndarray
+
+        >>> events = trigger.update(dvdt, t)
+
+        """
+        x = np.asarray(x, dtype=float)
+        if t is not None:
+            t = np.asarray(t, dtype=float)
+        events = [self._update_edge(s, x, t) for s in self._edges]
+        self._nprocessed += len(x)
+        # Keeping the last samples for crossing interpolation
+        if (self._interp is not None) and (t is not None):
+            self._xprev = np.concatenate([self._xprev, x])[-2:]
+            self._tprev = np.concatenate([self._tprev, t])[-2:]
+        return self._accept(np.concatenate(events), t is not None)
+
+    def flush(self):
+        """
+        Complete the open events (if any) at the end of the data stream and
+        return them.
+
+        :returns: The trigger events.
+        :rtype: structured ndarray
+
+        >>> events = trigger.flush()
+
+        """
+        events = np.zeros(len(self._edges), dtype=self.dtype)
+        keep = np.zeros(len(self._edges), dtype=bool)
+        for i, s in enumerate(self._edges):
+            if self._open[s] is not None:
+                events[i] = self._open[s]
+                events[i]['clustersize'] = self._nprocessed - events[i]['i0']
+                self._open[s] = None
+                keep[i] = True
+        events = events[keep]
+        return self._accept(events, not np.all(np.isnan(events['t0'])))
+
+    def _update_edge(self, s, x, t):
+        # Finds the completed events of edge `s` (1: rising, -1: falling)
+        n = len(x)
+        k0 = self._nprocessed
+        if n == 0:
+            return np.zeros(0, dtype=self.dtype)
+        # Flipping signal so falling edges are processed as rising ones
+        y = s*x
+        level = s*self._level
+        # Finding trigger on (1) and off (0) samples
+        onoff = np.full(n, -1, dtype=np.int8)
+        onoff[y <= level-self._hysteresis] = 0
+        onoff[y > level] = 1
+        # Holding the last on/off value in between (hysteresis band)
+        ilast = np.where(onoff >= 0, np.arange(n), -1)
+        np.maximum.accumulate(ilast, out=ilast)
+        state = np.where(ilast >= 0, onoff[ilast], self._state[s])
+        self._state[s] = state[-1]
+        # Finding events and signal peaks
+        i0, clustersize = find_cluster(state, 1, asarray=True)
+        ipeak, ypeak = _cluster_peaks(y, i0, clustersize)
+        events = np.zeros(len(i0), dtype=self.dtype)
+        events['i0'] = i0 + k0
+        events['clustersize'] = clustersize
+        events['ipeak'] = ipeak + k0
+        events['xpeak'] = s*ypeak
+        events['edge'] = s
+        if t is None:
+            events['t0'] = np.nan
+            events['tpeak'] = np.nan
+            events['ttrigger'] = np.nan
+        else:
+            events['t0'] = t[i0]
+            events['tpeak'] = t[ipeak]
+            events['ttrigger'] = t[i0]
+            if self._interp is not None:
+                # Including the last samples of the previous chunk
+                nprev = len(self._xprev)
+                events['ttrigger'] = interp_crossing(
+                    np.concatenate([self._xprev, x]),
+                    np.concatenate([self._tprev, t]),
+                    i0+nprev, self._level, method=self._interp)
+        # Completing open event from previous chunk
+        opened = self._open[s]
+        if opened is not None:
+            if len(i0) and (i0[0] == 0):
+                first = events[0].copy()
+                events[0] = opened
+                events[0]['clustersize'] = k0 - opened['i0'] + first['clustersize']
+                if s*first['xpeak'] > s*opened['xpeak']:
+                    events[0]['ipeak'] = first['ipeak']
+                    events[0]['xpeak'] = first['xpeak']
+                    events[0]['tpeak'] = first['tpeak']
+            else:
+                opened = opened.copy()
+                opened['clustersize'] = k0 - opened['i0']
+                events = np.concatenate([[opened], events])
+            self._open[s] = None
+        # Holding event that reaches the end of the chunk
+        if len(events) and (events[-1]['i0'] + events[-1]['clustersize'] == k0 + n):
+            self._open[s] = events[-1].copy()
+            events = events[:-1]
+        return events
+
+    def _accept(self, events, usetime):
+        # Applies minimum length and hold-off criteria to the events
+        events = events[events['clustersize'] >= self._minsize]
+        events = events[np.argsort(events['i0'], kind='stable')]
+        # Keeping events that start at least `holdoff` after the previous
+        # event of the same edge
+        start = events['t0'] if usetime else events['i0']
+        keep = np.ones(len(events), dtype=bool)
+        for i, (starti, edgei) in enumerate(zip(start, events['edge'])):
+            if starti - self._last[edgei] >= self._holdoff:
+                self._last[edgei] = starti
+            else:
+                keep[i] = False
+        return events[keep]
+
+
+def find_trigger(
+    x, level, t=None, edge='rising', hysteresis=0, minsize=1, holdoff=0,
+    interp=None):
+    """
+    Find trigger events in an ndarray.
+
+    This is the full array version of the `Trigger` class, where the
+    arguments and returned events are described.
+
+    Example
+    -------
+        >>> events = find_trigger(dxdt, 0.5, t=t, interp='linear')
+        >>> ttrigger = events['ttrigger']
+
+    """
+    trigger = Trigger(
+        level, edge=edge, hysteresis=hysteresis,
+        minsize=minsize, holdoff=holdoff, interp=interp)
+    events = trigger.update(x, t)
+    return np.concatenate([events, trigger.flush()])